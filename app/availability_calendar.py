@@ -0,0 +1,129 @@
+"""Run-length encoded availability calendars.
+
+A property's calendar merges three sources, one query each:
+
+- the property and its active pricing_rules (via the pricing rule-set cache),
+- property_availability rows in the window (blocks, price and min-stay
+  overrides),
+- active bookings overlapping the window.
+
+Days are evaluated as NumPy arrays and consecutive days with the same
+status, price and minimum stay collapse into a single run, so a year is
+typically a few dozen runs instead of 365 rows. Each property's calendar for
+the next CALENDAR_HORIZON_DAYS is cached; bookings and availability writes
+call invalidate_calendar() after committing.
+"""
+import os
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.cache import TTLCache
+from app.calendar import ACTIVE_BOOKING_FILTER
+from app.db import transaction_started
+from app.pricing import get_rule_set, load_overrides, minimum_nights_by_day, money, price_matrix, round_cents
+
+CALENDAR_HORIZON_DAYS = 731
+CALENDAR_CACHE_TTL = float(os.getenv("CALENDAR_CACHE_TTL", "60"))
+CALENDAR_CACHE_SIZE = int(os.getenv("CALENDAR_CACHE_SIZE", "1024"))
+
+AVAILABLE, BLOCKED, BOOKED = 0, 1, 2
+STATUS_NAMES = ("available", "blocked", "booked")
+
+_calendars = TTLCache(CALENDAR_CACHE_TTL, maxsize=CALENDAR_CACHE_SIZE)
+
+
+def _booked_ranges(conn, property_id: int, start: date, end: date):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT check_in_date, check_out_date
+            FROM bookings
+            WHERE property_id = %s AND {ACTIVE_BOOKING_FILTER}
+              AND check_in_date < %s AND check_out_date > %s
+        """, (property_id, end, start))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def build_calendar(conn, property_id: int, start: date, days: int):
+    """Runs for [start, start + days), or None if the property is not active."""
+    rule_set = get_rule_set(conn, property_id)
+    if rule_set is None:
+        return None
+    end = start + timedelta(days=days)
+    overrides = load_overrides(conn, [property_id], start, end)[property_id]
+    bookings = _booked_ranges(conn, property_id, start, end)
+
+    nights = np.arange(start.toordinal(), end.toordinal(), dtype=np.int64)
+    cents = round_cents(price_matrix([rule_set], nights, [overrides])[0])
+    minimums = minimum_nights_by_day(rule_set, nights, overrides)
+    statuses = np.full(days, AVAILABLE, dtype=np.int8)
+    for row in overrides:
+        if not row['is_available']:
+            statuses[(row['available_date'] - start).days] = BLOCKED
+    for row in bookings:
+        first = max(0, (row['check_in_date'] - start).days)
+        last = min(days, (row['check_out_date'] - start).days)
+        statuses[first:last] = BOOKED
+
+    return encode_runs(start, statuses, cents, minimums)
+
+
+def encode_runs(start: date, statuses, cents, minimums):
+    """Collapse per-day arrays into runs of identical (status, price, min stay)."""
+    changed = (np.diff(statuses) != 0) | (np.diff(cents) != 0) | (np.diff(minimums) != 0)
+    boundaries = np.concatenate(([0], np.flatnonzero(changed) + 1, [statuses.size]))
+    runs = []
+    for first, last in zip(boundaries[:-1], boundaries[1:]):
+        runs.append({
+            "start_date": start + timedelta(days=int(first)),
+            "end_date": start + timedelta(days=int(last) - 1),
+            "days": int(last - first),
+            "status": STATUS_NAMES[statuses[first]],
+            "price": money(cents[first]),
+            "minimum_nights": int(minimums[first]),
+        })
+    return runs
+
+
+def slice_runs(runs, start: date, end: date):
+    """Runs clipped to the inclusive range [start, end]."""
+    sliced = []
+    for run in runs:
+        if run["end_date"] < start or run["start_date"] > end:
+            continue
+        first = max(run["start_date"], start)
+        last = min(run["end_date"], end)
+        sliced.append({**run, "start_date": first, "end_date": last, "days": (last - first).days + 1})
+    return sliced
+
+
+def get_calendar(conn, property_id: int, start: date, end: date):
+    """Runs covering the inclusive range [start, end], or None for unknown properties.
+
+    Windows inside [today, today + CALENDAR_HORIZON_DAYS) are served from the
+    per-property cache; anything else is built on demand.
+    """
+    today = date.today()
+    horizon_end = today + timedelta(days=CALENDAR_HORIZON_DAYS - 1)
+    if start < today or end > horizon_end:
+        return build_calendar(conn, property_id, start, (end - start).days + 1)
+
+    def load():
+        return build_calendar(conn, property_id, today, CALENDAR_HORIZON_DAYS)
+
+    runs = _calendars.get((property_id, today), load, since=transaction_started(conn))
+    if runs is None:
+        _calendars.invalidate((property_id, today))
+        return None
+    return slice_runs(runs, start, end)
+
+
+def invalidate_calendar(property_id=None):
+    """Drop cached calendars for one property (or all) after a write."""
+    if property_id is None:
+        _calendars.invalidate()
+        return
+    _calendars.invalidate((property_id, date.today()))
@@ -0,0 +1,149 @@
+"""Scheduled booking status transitions.
+
+Moves bookings along the stay lifecycle by date, replacing per-row
+PUT /bookings/{id} calls:
+
+- confirmed -> in_progress once check_in_date is reached (and the stay has
+  not ended yet);
+- confirmed / in_progress -> completed once check_out_date is reached.
+
+Each transition walks its status on idx_booking_status in booking_id order,
+CHUNK_SIZE rows at a time. A chunk is locked with FOR UPDATE SKIP LOCKED (rows
+a user is editing right now are left for the next run), updated with one
+set-based UPDATE, counted into host_stats and committed together with a
+checkpoint, so locks are held for one chunk only and an interrupted pass
+resumes after the last committed chunk instead of starting over.
+"""
+import os
+import threading
+import time
+
+from app.availability_calendar import invalidate_calendar
+from app.host_stats import adjust_many
+
+LIFECYCLE_INTERVAL_SECONDS = int(os.getenv("BOOKING_LIFECYCLE_INTERVAL", "300"))
+CHUNK_SIZE = int(os.getenv("BOOKING_LIFECYCLE_CHUNK_SIZE", "1000"))
+
+# (name, statuses to move from, status to move to, date condition)
+TRANSITIONS = (
+    ("in_progress", ("confirmed",), "in_progress",
+     "b.check_in_date <= CURDATE() AND b.check_out_date > CURDATE()"),
+    ("completed", ("confirmed", "in_progress"), "completed",
+     "b.check_out_date <= CURDATE()"),
+)
+
+_progress_lock = threading.Lock()
+_progress = {}
+
+
+def _set_progress(name, **fields):
+    with _progress_lock:
+        _progress.setdefault(name, {}).update(fields)
+
+
+def lifecycle_progress():
+    """Progress of the current or most recent pass of each transition."""
+    with _progress_lock:
+        return {name: dict(fields) for name, fields in _progress.items()}
+
+
+def _checkpoint_name(transition):
+    return f"booking_lifecycle:{transition}"
+
+
+def _load_checkpoint(cursor, name, today):
+    """Resume point for an unfinished pass started today, else a fresh start."""
+    cursor.execute("""
+        SELECT run_date, last_id, processed, completed
+        FROM scheduler_checkpoints
+        WHERE job_name = %s
+    """, (name,))
+    row = cursor.fetchone()
+    if row and row['run_date'] == today and not row['completed']:
+        return row['last_id'], row['processed']
+    return 0, 0
+
+
+def _save_checkpoint(cursor, name, today, last_id, processed, completed):
+    cursor.execute("""
+        INSERT INTO scheduler_checkpoints (job_name, run_date, last_id, processed, completed)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            run_date = VALUES(run_date),
+            last_id = VALUES(last_id),
+            processed = VALUES(processed),
+            completed = VALUES(completed)
+    """, (name, today, last_id, processed, completed))
+
+
+def _run_transition(conn, cursor, today, name, from_statuses, to_status, date_condition):
+    checkpoint = _checkpoint_name(name)
+    last_id, processed = _load_checkpoint(cursor, checkpoint, today)
+    conn.commit()
+    _set_progress(name, state="running", started_at=time.time(), finished_at=None, error=None,
+                  run_date=str(today), last_booking_id=last_id, processed=processed, chunks=0)
+    status_placeholders = ", ".join(["%s"] * len(from_statuses))
+    chunks = 0
+    while True:
+        cursor.execute(f"""
+            SELECT b.booking_id, b.booking_status, b.property_id, p.host_id
+            FROM bookings b
+            JOIN properties p ON p.property_id = b.property_id
+            WHERE b.booking_status IN ({status_placeholders})
+              AND {date_condition}
+              AND b.booking_id > %s
+            ORDER BY b.booking_id
+            LIMIT %s
+            FOR UPDATE OF b SKIP LOCKED
+        """, list(from_statuses) + [last_id, CHUNK_SIZE])
+        rows = cursor.fetchall()
+        if not rows:
+            _save_checkpoint(cursor, checkpoint, today, last_id, processed, True)
+            conn.commit()
+            break
+
+        ids = [row['booking_id'] for row in rows]
+        cursor.execute(
+            f"UPDATE bookings SET booking_status = %s WHERE booking_id IN ({', '.join(['%s'] * len(ids))})",
+            [to_status] + ids
+        )
+        if to_status == "completed":
+            completed_by_host = {}
+            for row in rows:
+                if row['booking_status'] != "completed":
+                    completed_by_host[row['host_id']] = completed_by_host.get(row['host_id'], 0) + 1
+            adjust_many(cursor, "completed_bookings", completed_by_host)
+
+        last_id = ids[-1]
+        processed += len(ids)
+        chunks += 1
+        _save_checkpoint(cursor, checkpoint, today, last_id, processed, False)
+        conn.commit()
+        for property_id in {row['property_id'] for row in rows}:
+            invalidate_calendar(property_id)
+        _set_progress(name, last_booking_id=last_id, processed=processed, chunks=chunks)
+
+    _set_progress(name, state="idle", finished_at=time.time())
+    return processed
+
+
+def run_lifecycle(conn):
+    """Run every transition once; returns rows moved per transition for this day."""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT CURDATE() AS today")
+        today = cursor.fetchone()['today']
+        conn.commit()
+        result = {}
+        for name, from_statuses, to_status, date_condition in TRANSITIONS:
+            try:
+                result[name] = _run_transition(
+                    conn, cursor, today, name, from_statuses, to_status, date_condition
+                )
+            except Exception as err:
+                conn.rollback()
+                _set_progress(name, state="failed", finished_at=time.time(), error=str(err))
+                raise
+        return result
+    finally:
+        cursor.close()
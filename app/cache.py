@@ -0,0 +1,83 @@
+import threading
+import time
+
+
+class TTLCache:
+    """Small thread-safe in-process cache with per-entry expiry.
+
+    Each worker process keeps its own copy, so writers must call invalidate()
+    after committing; the TTL bounds how long other workers can serve stale
+    entries.
+
+    Loaders usually read through the request's connection, whose snapshot may
+    predate a write that was committed and invalidated in the meantime. get()
+    and put() therefore take `since`, the time the loaded data was read as of
+    at the latest (see app.db.transaction_started), and drop the value instead
+    of caching it when the key was invalidated at or after that time.
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 1024):
+        self.ttl = ttl_seconds
+        self.maxsize = maxsize
+        self._entries = {}
+        # Last invalidate(key) per key; _invalidated_all covers every key
+        # (invalidate() and pruning of _invalidated both raise it)
+        self._invalidated = {}
+        self._invalidated_all = float("-inf")
+        self._lock = threading.Lock()
+
+    def get(self, key, loader, since=None):
+        now = time.monotonic()
+        if since is None:
+            since = now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        value = loader()
+        self.put(key, value, since=since)
+        return value
+
+    def peek(self, key):
+        """Return the cached value if present and fresh, else None (no loading)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+        return None
+
+    def put(self, key, value, since=None):
+        """Cache value unless key was invalidated at or after `since`; returns whether it was stored."""
+        now = time.monotonic()
+        with self._lock:
+            if since is not None and max(self._invalidated_all, self._invalidated.get(key, float("-inf"))) >= since:
+                return False
+            if len(self._entries) >= self.maxsize and key not in self._entries:
+                self._evict(now)
+            self._entries[key] = (now + self.ttl, value)
+        return True
+
+    def _evict(self, now):
+        expired = [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for k in expired:
+            del self._entries[k]
+        if len(self._entries) >= self.maxsize:
+            # Still full: drop the entry closest to expiry.
+            oldest = min(self._entries, key=lambda k: self._entries[k][0])
+            del self._entries[oldest]
+
+    def invalidate(self, key=None):
+        now = time.monotonic()
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._invalidated.clear()
+                self._invalidated_all = now
+                return
+            self._entries.pop(key, None)
+            self._invalidated[key] = now
+            if len(self._invalidated) > self.maxsize:
+                # Forget per-key times, conservatively treating them all as
+                # the latest one.
+                self._invalidated_all = max(self._invalidated.values())
+                self._invalidated.clear()
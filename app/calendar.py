@@ -0,0 +1,78 @@
+from datetime import date
+
+from app.holds import EXPIRED_HOLD_CONDITION
+
+# Bookings that occupy the calendar: not cancelled and not an expired,
+# still-unswept hold
+ACTIVE_BOOKING_FILTER = f"booking_status <> 'cancelled' AND NOT ({EXPIRED_HOLD_CONDITION})"
+
+# Select expressions answering "can [check_in, check_out) be booked on this
+# property?"; bind stay_conflict_params() for them, in this order.
+STAY_CONFLICT_COLUMNS = f"""
+    EXISTS(
+        SELECT 1 FROM bookings
+        WHERE property_id = %s AND {ACTIVE_BOOKING_FILTER}
+          AND check_in_date < %s AND check_out_date > %s
+          AND booking_id <> %s
+    ) AS booked,
+    EXISTS(
+        SELECT 1 FROM property_availability
+        WHERE property_id = %s
+          AND available_date >= %s AND available_date < %s
+          AND is_available = FALSE
+    ) AS blocked
+"""
+
+
+def stay_conflict_params(property_id: int, check_in: date, check_out: date, exclude_booking_id=None):
+    return [
+        property_id, check_out, check_in, exclude_booking_id or 0,
+        property_id, check_in, check_out,
+    ]
+
+
+
+def booked_property_ids(conn, property_ids, check_in: date, check_out: date):
+    """Those of property_ids with an active booking overlapping [check_in, check_out).
+
+    One query for any number of properties, using the same active-booking
+    rule as STAY_CONFLICT_COLUMNS.
+    """
+    property_ids = list(dict.fromkeys(property_ids))
+    if not property_ids:
+        return set()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+            SELECT DISTINCT property_id
+            FROM bookings
+            WHERE property_id IN ({", ".join(["%s"] * len(property_ids))})
+              AND {ACTIVE_BOOKING_FILTER}
+              AND check_in_date < %s AND check_out_date > %s
+        """, property_ids + [check_out, check_in])
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+# WHERE fragment keeping properties (aliased p) free for the whole stay: no
+# active booking overlapping [check_in, check_out) and no blocked day in it.
+# Bind available_for_stay_params(). Both probes are range scans on
+# idx_bookings_property_dates / idx_property_availability_blocked per
+# candidate, and MySQL stops once LIMIT rows have passed.
+AVAILABLE_FOR_STAY_FILTER = f"""
+    NOT EXISTS(
+        SELECT 1 FROM bookings
+        WHERE bookings.property_id = p.property_id AND {ACTIVE_BOOKING_FILTER}
+          AND check_in_date < %s AND check_out_date > %s
+    )
+    AND NOT EXISTS(
+        SELECT 1 FROM property_availability
+        WHERE property_availability.property_id = p.property_id
+          AND is_available = FALSE
+          AND available_date >= %s AND available_date < %s
+    )
+"""
+
+
+def available_for_stay_params(check_in: date, check_out: date):
+    return [check_out, check_in, check_in, check_out]
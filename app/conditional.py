@@ -0,0 +1,59 @@
+import hashlib
+from datetime import timezone
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Response, status
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag derived from the values that determine a representation.
+
+    Weak because it is built from validators such as updated_at rather than
+    the serialized body; TIMESTAMP(6) columns keep two writes from sharing it.
+    """
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+# last_modified values below are seconds since the epoch as returned by
+# UNIX_TIMESTAMP(updated_at), so they don't depend on the server or session
+# time zone.
+def http_date(last_modified) -> str:
+    return formatdate(float(last_modified), usegmt=True)
+
+
+def validator_headers(etag: str, last_modified=None) -> dict:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored.
+    opaque = etag.removeprefix("W/")
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == opaque for tag in candidates)
+
+
+def is_not_modified(if_none_match, if_modified_since, etag: str, last_modified=None) -> bool:
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return int(float(last_modified)) <= since.timestamp()
+    return False
+
+
+def not_modified_response(etag: str, last_modified=None) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=validator_headers(etag, last_modified)
+    )
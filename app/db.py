@@ -1,15 +1,295 @@
+import asyncio
+import functools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import mysql.connector
 from fastapi import HTTPException
 
-def get_connection():
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "user": os.getenv("DB_USER", "root"),
+    "password": os.getenv("DB_PASSWORD", ""),
+    "database": os.getenv("DB_NAME", "airbnb_system"),
+}
+
+# Pool sizing is per worker process: total connections to MySQL are roughly
+# workers * (DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW).
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "5"))
+POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+# Blocking driver calls run on this many threads; defaults to the most
+# connections the pool will ever hand out so threads never wait on each other
+# for a connection they could not get anyway.
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(POOL_SIZE + POOL_MAX_OVERFLOW)))
+# Invariant: only work that already holds a connection (handlers, background
+# job bodies, close()) runs on the DB executor, so every thread there always
+# finishes and returns its connection. Checkouts, which can block for up to
+# DB_POOL_TIMEOUT, wait on their own threads instead; otherwise a burst of
+# requests could fill the DB executor with waiters while the requests holding
+# connections queue behind them for a thread to finish on.
+DB_CHECKOUT_WORKERS = int(os.getenv("DB_CHECKOUT_WORKERS", str(POOL_SIZE + POOL_MAX_OVERFLOW)))
+
+
+class PooledConnection:
+    """Wraps a mysql.connector connection so close() hands it back to the pool."""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = time.monotonic()
+        self._closed = False
+        self.transaction_started = self._created_at
+
+    def commit(self):
+        self._raw.commit()
+        self.transaction_started = time.monotonic()
+
+    def rollback(self):
+        self._raw.rollback()
+        self.transaction_started = time.monotonic()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    @property
+    def age(self):
+        return time.monotonic() - self._created_at
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._pool._release(self)
+
+    def invalidate(self):
+        """Drop the underlying connection instead of returning it to the pool.
+
+        Used when a connection is left in an unknown state, e.g. an unbuffered
+        result set that was abandoned half-read.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._pool._release(self, discard=True)
+
+
+class ConnectionPool:
+    def __init__(self, size, max_overflow, recycle, pre_ping, timeout, **connect_args):
+        self.size = size
+        self.max_overflow = max_overflow
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.timeout = timeout
+        self._connect_args = connect_args
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._checked_out = 0
+        self._overflow_in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._invalidated = 0
+
+    def _connect(self):
+        return mysql.connector.connect(**self._connect_args)
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except mysql.connector.Error:
+            pass
+        with self._lock:
+            self._opened -= 1
+
+    def _is_usable(self, conn):
+        if self.recycle and conn.age > self.recycle:
+            with self._lock:
+                self._recycled += 1
+            return False
+        if self.pre_ping:
+            try:
+                conn._raw.ping(reconnect=False)
+            except mysql.connector.Error:
+                with self._lock:
+                    self._invalidated += 1
+                return False
+        return True
+
+    def _open_new(self):
+        try:
+            raw = self._connect()
+        except mysql.connector.Error:
+            with self._lock:
+                self._opened -= 1
+            raise
+        return PooledConnection(self, raw)
+
+    def checkout(self, deadline=None):
+        if deadline is None:
+            deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                pooled = None
+
+            if pooled is not None:
+                if self._is_usable(pooled):
+                    break
+                self._discard(pooled._raw)
+                continue
+
+            with self._lock:
+                can_open = self._opened < self.size + self.max_overflow
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                pooled = self._open_new()
+                break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                with self._lock:
+                    self._timeouts += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Database connection pool exhausted"
+                )
+            try:
+                pooled = self._idle.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if self._is_usable(pooled):
+                break
+            self._discard(pooled._raw)
+
+        pooled._closed = False
+        pooled.transaction_started = time.monotonic()
+        with self._lock:
+            self._checked_out += 1
+            self._checkouts += 1
+            self._overflow_in_use = max(0, self._checked_out - self.size)
+        return pooled
+
+    def _release(self, pooled, discard=False):
+        with self._lock:
+            self._checked_out -= 1
+            self._overflow_in_use = max(0, self._checked_out - self.size)
+        if discard:
+            self._discard(pooled._raw)
+            return
+        try:
+            # Never hand the next request a half-finished transaction.
+            pooled._raw.rollback()
+        except mysql.connector.Error:
+            self._discard(pooled._raw)
+            return
+        try:
+            self._idle.put_nowait(pooled)
+        except queue.Full:
+            # Overflow connection: close it instead of keeping it idle.
+            self._discard(pooled._raw)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pool_size": self.size,
+                "max_overflow": self.max_overflow,
+                "recycle_seconds": self.recycle,
+                "pre_ping": self.pre_ping,
+                "timeout_seconds": self.timeout,
+                "opened": self._opened,
+                "idle": self._idle.qsize(),
+                "checked_out": self._checked_out,
+                "overflow_in_use": self._overflow_in_use,
+                "total_checkouts": self._checkouts,
+                "checkout_timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "invalidated": self._invalidated,
+            }
+
+
+pool = ConnectionPool(
+    size=POOL_SIZE,
+    max_overflow=POOL_MAX_OVERFLOW,
+    recycle=POOL_RECYCLE_SECONDS,
+    pre_ping=POOL_PRE_PING,
+    timeout=POOL_TIMEOUT_SECONDS,
+    **DB_CONFIG,
+)
+
+
+def get_connection(deadline=None):
     try:
-        conn = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="",
-            database="airbnb_system",
-              # Use dictionary cursor for named access to columns
-        )
-        return conn
+        return pool.checkout(deadline)
     except mysql.connector.Error as err:
-        raise HTTPException(status_code=500, detail=f"Database connection error: {err}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Database connection error: {err}")
+
+
+def transaction_started(conn):
+    """Monotonic time no later than the snapshot of conn's current transaction.
+
+    InnoDB takes a REPEATABLE READ snapshot at the transaction's first read,
+    which is never before checkout or the last commit/rollback. Caches pass
+    this as `since` so rows read here are not stored over a newer write.
+    """
+    return getattr(conn, "transaction_started", None)
+
+
+def get_pool_stats():
+    return pool.stats()
+
+
+db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db")
+checkout_executor = ThreadPoolExecutor(max_workers=DB_CHECKOUT_WORKERS, thread_name_prefix="db-checkout")
+
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database callable on the bounded DB executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args, **kwargs))
+
+
+async def acquire_connection():
+    """Check a pooled connection out without holding a DB executor thread.
+
+    The deadline starts now, so time spent queued for a checkout thread
+    counts towards DB_POOL_TIMEOUT. Return the connection with
+    ``await run_db(conn.close)``.
+    """
+    deadline = time.monotonic() + pool.timeout
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(checkout_executor, functools.partial(get_connection, deadline))
+
+
+def db_bound(func):
+    """Turn a blocking route handler into an async one that runs on the DB executor.
+
+    functools.wraps keeps the original signature visible to FastAPI, so query,
+    path and body parameters are resolved exactly as before.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_db(func, *args, **kwargs)
+    return wrapper
+
+
+async def get_db():
+    """FastAPI dependency yielding one pooled connection per request.
+
+    Everything the handler and its validation helpers run on this connection
+    shares a single transaction until the handler commits; anything left
+    uncommitted is rolled back when the connection goes back to the pool.
+    """
+    conn = await acquire_connection()
+    try:
+        yield conn
+    finally:
+        await run_db(conn.close)
@@ -0,0 +1,104 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 9  # ~5m cells; matches property_addresses.geohash CHAR(9)
+MAX_COVER_CELLS = 32
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if longitude >= mid:
+                value = (value << 1) | 1
+                lng_lo = mid
+            else:
+                value <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int):
+    """(lat_degrees, lng_degrees) spanned by one geohash cell."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = (5 * precision) // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def covering_prefixes(min_lat, max_lat, min_lng, max_lng, max_cells: int = MAX_COVER_CELLS):
+    """Geohash prefixes whose cells together cover the bounding box.
+
+    Picks the longest prefix length that needs at most max_cells cells, so the
+    index range scans stay few and tight.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lng_step = cell_size(precision)
+        rows = math.floor(max_lat / lat_step) - math.floor(min_lat / lat_step) + 1
+        cols = math.floor(max_lng / lng_step) - math.floor(min_lng / lng_step) + 1
+        if rows * cols <= max_cells:
+            break
+    prefixes = set()
+    lat = min_lat
+    while True:
+        lng = min_lng
+        while True:
+            prefixes.add(geohash_encode(lat, lng, precision))
+            if lng >= max_lng:
+                break
+            lng = min(lng + lng_step, max_lng)
+        if lat >= max_lat:
+            break
+        lat = min(lat + lat_step, max_lat)
+    return sorted(prefixes)
+
+
+def radius_bboxes(latitude: float, longitude: float, radius_km: float):
+    """Bounding boxes (min_lat, max_lat, min_lng, max_lng) enclosing a circle.
+
+    Usually one box; a circle crossing the antimeridian is split into one box
+    on each side of it, since a BETWEEN on longitude can only cover one.
+    """
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(latitude))
+    lng_delta = 180.0 if cos_lat < 1e-9 else min(180.0, lat_delta / cos_lat)
+    min_lat = max(-90.0, latitude - lat_delta)
+    max_lat = min(90.0, latitude + lat_delta)
+    if lng_delta >= 180.0:
+        return [(min_lat, max_lat, -180.0, 180.0)]
+    west, east = longitude - lng_delta, longitude + lng_delta
+    if west < -180.0:
+        return [(min_lat, max_lat, -180.0, east), (min_lat, max_lat, west + 360.0, 180.0)]
+    if east > 180.0:
+        return [(min_lat, max_lat, west, 180.0), (min_lat, max_lat, -180.0, east - 360.0)]
+    return [(min_lat, max_lat, west, east)]
+
+
+# Haversine distance in SQL; parameters are (center_lat, center_lat, center_lng).
+HAVERSINE_SQL = (
+    f"({2 * EARTH_RADIUS_KM} * ASIN(SQRT("
+    "POWER(SIN(RADIANS(pa.latitude - %s) / 2), 2) + "
+    "COS(RADIANS(%s)) * COS(RADIANS(pa.latitude)) * "
+    "POWER(SIN(RADIANS(pa.longitude - %s) / 2), 2))))"
+)
@@ -0,0 +1,132 @@
+"""Expiring holds for unpaid pending bookings.
+
+A booking that is still pending with a pending payment HOLD_TTL seconds
+after it was created has expired. From that moment the calendar ignores it
+(see calendar.ACTIVE_BOOKING_FILTER). The sweeper then cancels it for good.
+
+Expiry times sit in a min-heap keyed by expiry, so a sweep pops only the
+holds that are due. Cost is O(expired * log n), never a scan of bookings. The heap
+is rebuilt from the DB (via idx_booking_status) on the first sweep after
+startup and every HOLD_REBUILD_INTERVAL after that, which also picks up
+holds created by other worker processes. Entries whose booking was paid or
+changed in the meantime are harmless: each batch re-checks the hold
+condition under a row lock and leaves them alone. Cached calendars of the
+affected properties are invalidated after each batch commits.
+"""
+import heapq
+import os
+import threading
+import time
+from datetime import timedelta
+
+HOLD_TTL_SECONDS = int(os.getenv("HOLD_TTL", "900"))
+SWEEP_INTERVAL_SECONDS = int(os.getenv("HOLD_SWEEP_INTERVAL", "30"))
+REBUILD_INTERVAL_SECONDS = int(os.getenv("HOLD_REBUILD_INTERVAL", "3600"))
+CANCEL_BATCH_SIZE = 500
+
+HOLD_CONDITION = "booking_status = 'pending' AND payment_status = 'pending'"
+EXPIRED_HOLD_CONDITION = (
+    f"{HOLD_CONDITION} AND created_at <= NOW() - INTERVAL {HOLD_TTL_SECONDS} SECOND"
+)
+EXPIRY_REASON = "Hold expired before payment"
+
+_heap = []
+_queued = set()
+_lock = threading.Lock()
+_last_rebuild = None
+
+
+def is_hold(booking_status: str, payment_status: str) -> bool:
+    return booking_status == "pending" and payment_status == "pending"
+
+
+def track(booking_id: int, created_at):
+    """Queue a new hold for expiry; call after the booking is committed."""
+    expires_at = created_at + timedelta(seconds=HOLD_TTL_SECONDS)
+    with _lock:
+        if booking_id not in _queued:
+            _queued.add(booking_id)
+            heapq.heappush(_heap, (expires_at, booking_id))
+
+
+def pending_count() -> int:
+    with _lock:
+        return len(_heap)
+
+
+def rebuild(conn):
+    """Reload every open hold from the database into the heap."""
+    global _last_rebuild
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"SELECT booking_id, created_at FROM bookings WHERE {HOLD_CONDITION}")
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    conn.commit()
+    entries = [(row['created_at'] + timedelta(seconds=HOLD_TTL_SECONDS), row['booking_id']) for row in rows]
+    heapq.heapify(entries)
+    with _lock:
+        _heap[:] = entries
+        _queued.clear()
+        _queued.update(booking_id for _, booking_id in entries)
+    _last_rebuild = time.monotonic()
+    return len(entries)
+
+
+def _pop_due(now):
+    due = []
+    with _lock:
+        while _heap and _heap[0][0] <= now:
+            _, booking_id = heapq.heappop(_heap)
+            _queued.discard(booking_id)
+            due.append(booking_id)
+    return due
+
+
+def sweep(conn):
+    """Cancel holds that have expired; returns counts for the task status."""
+    # availability_calendar imports this module (via app.calendar)
+    from app.availability_calendar import invalidate_calendar
+
+    if _last_rebuild is None or time.monotonic() - _last_rebuild >= REBUILD_INTERVAL_SECONDS:
+        rebuild(conn)
+    with _lock:
+        if not _heap:
+            return {"due": 0, "cancelled": 0, "queued": 0}
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT NOW() AS db_now")
+        due = _pop_due(cursor.fetchone()['db_now'])
+        cancelled = 0
+        for start in range(0, len(due), CANCEL_BATCH_SIZE):
+            batch = due[start:start + CANCEL_BATCH_SIZE]
+            # Lock the holds that are still unpaid and expired; paid or edited
+            # ones drop out here and are left alone
+            cursor.execute(f"""
+                SELECT booking_id, property_id
+                FROM bookings
+                WHERE booking_id IN ({", ".join(["%s"] * len(batch))})
+                  AND {EXPIRED_HOLD_CONDITION}
+                FOR UPDATE
+            """, batch)
+            expired = cursor.fetchall()
+            if not expired:
+                conn.commit()
+                continue
+            ids = [row['booking_id'] for row in expired]
+            cursor.execute(f"""
+                UPDATE bookings
+                SET booking_status = 'cancelled',
+                    cancellation_reason = %s,
+                    cancelled_at = NOW()
+                WHERE booking_id IN ({", ".join(["%s"] * len(ids))})
+            """, [EXPIRY_REASON] + ids)
+            cancelled += cursor.rowcount
+            conn.commit()
+            for property_id in {row['property_id'] for row in expired}:
+                invalidate_calendar(property_id)
+        return {"due": len(due), "cancelled": cancelled, "queued": pending_count()}
+    finally:
+        cursor.close()
@@ -0,0 +1,205 @@
+"""Per-host dashboard counters.
+
+host_stats holds one row per host with the figures the dashboard shows:
+
+- total_properties: the host's active listings
+- completed_bookings: completed bookings on any of the host's listings
+- net_earnings: sum of host_earnings.net_amount
+- rating_sum / rating_count: guest_to_host reviews naming the host
+
+Writers call adjust() on their own cursor before committing, so counters
+move in the same transaction as the row that changed them. reconcile()
+recomputes rows from the source tables; it runs periodically from the task
+runner and from the command line:
+
+    python -m app.host_stats                 # every host
+    python -m app.host_stats --host-id 12
+"""
+import argparse
+import os
+
+import mysql.connector
+
+from app.db import DB_CONFIG
+
+COUNTER_COLUMNS = ("total_properties", "completed_bookings", "net_earnings", "rating_sum", "rating_count")
+
+RECONCILE_INTERVAL_SECONDS = int(os.getenv("HOST_STATS_RECONCILE_INTERVAL", "3600"))
+# Hosts recomputed per transaction, so a full pass never locks every source row at once
+RECONCILE_BATCH_SIZE = int(os.getenv("HOST_STATS_RECONCILE_BATCH", "500"))
+
+COMPLETED_STATUS = "completed"
+
+# Each aggregate comes from its own derived table, so no join fans out into
+# another and the sums stay exact.
+RECONCILE_QUERY = """
+    INSERT INTO host_stats (host_id, total_properties, completed_bookings,
+                            net_earnings, rating_sum, rating_count, reconciled_at)
+    SELECT u.user_id,
+           COALESCE(p.total_properties, 0),
+           COALESCE(b.completed_bookings, 0),
+           COALESCE(e.net_earnings, 0),
+           COALESCE(r.rating_sum, 0),
+           COALESCE(r.rating_count, 0),
+           NOW()
+    FROM users u
+    LEFT JOIN (
+        SELECT host_id, COUNT(*) AS total_properties
+        FROM properties
+        WHERE is_active = TRUE AND host_id IN ({ids})
+        GROUP BY host_id
+    ) p ON p.host_id = u.user_id
+    LEFT JOIN (
+        SELECT pr.host_id, COUNT(*) AS completed_bookings
+        FROM bookings bk
+        JOIN properties pr ON pr.property_id = bk.property_id
+        WHERE bk.booking_status = 'completed' AND pr.host_id IN ({ids})
+        GROUP BY pr.host_id
+    ) b ON b.host_id = u.user_id
+    LEFT JOIN (
+        SELECT host_id, SUM(net_amount) AS net_earnings
+        FROM host_earnings
+        WHERE host_id IN ({ids})
+        GROUP BY host_id
+    ) e ON e.host_id = u.user_id
+    LEFT JOIN (
+        SELECT reviewee_id, SUM(rating) AS rating_sum, COUNT(*) AS rating_count
+        FROM reviews
+        WHERE review_type = 'guest_to_host' AND reviewee_id IN ({ids})
+        GROUP BY reviewee_id
+    ) r ON r.reviewee_id = u.user_id
+    WHERE u.user_id IN ({ids})
+    ON DUPLICATE KEY UPDATE
+        total_properties = VALUES(total_properties),
+        completed_bookings = VALUES(completed_bookings),
+        net_earnings = VALUES(net_earnings),
+        rating_sum = VALUES(rating_sum),
+        rating_count = VALUES(rating_count),
+        reconciled_at = VALUES(reconciled_at)
+"""
+
+
+def adjust(cursor, host_id: int, **deltas):
+    """Add deltas to a host's counters, creating the row on first use.
+
+    Runs on the caller's cursor and does not commit.
+    """
+    deltas = {column: value for column, value in deltas.items() if value}
+    if not deltas:
+        return
+    unknown = set(deltas) - set(COUNTER_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown host_stats columns: {', '.join(sorted(unknown))}")
+    columns = list(deltas)
+    cursor.execute(f"""
+        INSERT INTO host_stats (host_id, {", ".join(columns)})
+        VALUES ({", ".join(["%s"] * (len(columns) + 1))})
+        ON DUPLICATE KEY UPDATE
+        {", ".join(f"{c} = {c} + VALUES({c})" for c in columns)}
+    """, [host_id] + [deltas[c] for c in columns])
+
+
+def adjust_many(cursor, column: str, deltas_by_host):
+    """Add per-host deltas to one counter with a single multi-row upsert."""
+    if column not in COUNTER_COLUMNS:
+        raise ValueError(f"Unknown host_stats column: {column}")
+    rows = [(host_id, delta) for host_id, delta in deltas_by_host.items() if delta]
+    if not rows:
+        return
+    cursor.execute(f"""
+        INSERT INTO host_stats (host_id, {column})
+        VALUES {", ".join(["(%s, %s)"] * len(rows))}
+        ON DUPLICATE KEY UPDATE {column} = {column} + VALUES({column})
+    """, [value for row in rows for value in row])
+
+
+def completion_delta(old_status, new_status):
+    """+1 / -1 / 0 change in completed_bookings for a booking status change."""
+    return (new_status == COMPLETED_STATUS) - (old_status == COMPLETED_STATUS)
+
+
+def get_host_stats(conn, host_id: int):
+    """Dashboard row for a host, or None if the user is not a host."""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT u.user_id AS host_id, u.first_name, u.last_name,
+                   COALESCE(s.total_properties, 0) AS total_properties,
+                   COALESCE(s.completed_bookings, 0) AS completed_bookings,
+                   COALESCE(s.net_earnings, 0) AS net_earnings,
+                   COALESCE(s.rating_sum, 0) AS rating_sum,
+                   COALESCE(s.rating_count, 0) AS rating_count,
+                   s.updated_at, s.reconciled_at
+            FROM users u
+            LEFT JOIN host_stats s ON s.host_id = u.user_id
+            WHERE u.user_id = %s AND u.is_host = TRUE
+        """, (host_id,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    if row:
+        row['average_rating'] = (
+            round(row['rating_sum'] / row['rating_count'], 2) if row['rating_count'] else None
+        )
+    return row
+
+
+def reconcile(conn, host_ids=None):
+    """Recompute host_stats rows from the source tables.
+
+    Hosts are processed in batches of RECONCILE_BATCH_SIZE, one transaction
+    per batch. Returns the number of hosts reconciled.
+    """
+    cursor = conn.cursor()
+    reconciled = 0
+    try:
+        if host_ids:
+            pending = sorted(set(host_ids))
+            batches = (pending[i:i + RECONCILE_BATCH_SIZE] for i in range(0, len(pending), RECONCILE_BATCH_SIZE))
+        else:
+            batches = _all_host_batches(cursor)
+        for batch in batches:
+            ids = ", ".join(["%s"] * len(batch))
+            cursor.execute(RECONCILE_QUERY.format(ids=ids), list(batch) * 5)
+            conn.commit()
+            reconciled += len(batch)
+        return reconciled
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def _all_host_batches(cursor):
+    last_id = 0
+    while True:
+        cursor.execute("""
+            SELECT user_id FROM users
+            WHERE is_host = TRUE AND user_id > %s
+            ORDER BY user_id
+            LIMIT %s
+        """, (last_id, RECONCILE_BATCH_SIZE))
+        batch = [row[0] for row in cursor.fetchall()]
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile host_stats from the source tables.")
+    parser.add_argument("--host-id", type=int, action="append", dest="host_ids",
+                        help="limit reconciliation to this host (repeatable)")
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        reconciled = reconcile(conn, args.host_ids)
+    finally:
+        conn.close()
+    print(f"reconciled host_stats for {reconciled} hosts")
+
+
+if __name__ == "__main__":
+    main()
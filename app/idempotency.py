@@ -0,0 +1,212 @@
+"""Idempotency-Key support for POST endpoints.
+
+A client that retries a POST with the same Idempotency-Key gets the stored
+response back instead of a second write. Records are scoped per endpoint,
+expire after IDEMPOTENCY_TTL seconds and remember a fingerprint of the
+request body; reusing a key with a different body is rejected with 422.
+
+Two stores are provided. IDEMPOTENCY_BACKEND picks one, and set_store()
+installs any other implementation:
+
+- mysql (default): the idempotency_keys table. The record is inserted in the
+  same transaction as the write it describes, so the two commit or roll
+  back together. Concurrent duplicates collide on the primary key.
+- memory: a bounded per-process LRU dict. It is saved after commit, so it
+  only de-duplicates retries served by the same worker.
+
+Expired rows are removed by the purge task registered in main.py.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import mysql.connector
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_BACKEND = os.getenv("IDEMPOTENCY_BACKEND", "mysql").lower()
+IDEMPOTENCY_MEMORY_MAXSIZE = int(os.getenv("IDEMPOTENCY_MEMORY_MAXSIZE", "10000"))
+PURGE_INTERVAL_SECONDS = int(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "600"))
+PURGE_BATCH_SIZE = 1000
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+MYSQL_DUPLICATE_KEY = 1062
+
+
+class IdempotencyConflict(Exception):
+    """Another request stored a record for the same key first."""
+
+
+class IdempotencyRecord:
+    __slots__ = ("scope", "key", "fingerprint", "status_code", "body")
+
+    def __init__(self, scope, key, fingerprint, status_code=None, body=None):
+        self.scope = scope
+        self.key = key
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.body = body
+
+
+class MySQLIdempotencyStore:
+    transactional = True
+
+    def get(self, conn, scope, key) -> Optional[IdempotencyRecord]:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT request_hash, status_code, response_body
+                FROM idempotency_keys
+                WHERE scope = %s AND idem_key = %s AND expires_at > NOW()
+            """, (scope, key))
+            row = cursor.fetchone()
+        finally:
+            cursor.close()
+        if not row:
+            return None
+        return IdempotencyRecord(scope, key, row['request_hash'], row['status_code'],
+                                 json.loads(row['response_body']))
+
+    def save(self, cursor, record: IdempotencyRecord):
+        # An expired record for the same key must not block the new one
+        cursor.execute("""
+            DELETE FROM idempotency_keys
+            WHERE scope = %s AND idem_key = %s AND expires_at <= NOW()
+        """, (record.scope, record.key))
+        try:
+            cursor.execute("""
+                INSERT INTO idempotency_keys
+                    (scope, idem_key, request_hash, status_code, response_body, expires_at)
+                VALUES (%s, %s, %s, %s, %s, NOW() + INTERVAL %s SECOND)
+            """, (record.scope, record.key, record.fingerprint, record.status_code,
+                  json.dumps(record.body), IDEMPOTENCY_TTL_SECONDS))
+        except mysql.connector.IntegrityError as err:
+            if err.errno == MYSQL_DUPLICATE_KEY:
+                raise IdempotencyConflict() from err
+            raise
+
+    def saved(self, record: IdempotencyRecord):
+        pass
+
+    def purge_expired(self, conn):
+        cursor = conn.cursor()
+        purged = 0
+        try:
+            while True:
+                cursor.execute(
+                    "DELETE FROM idempotency_keys WHERE expires_at <= NOW() LIMIT %s",
+                    (PURGE_BATCH_SIZE,)
+                )
+                deleted = cursor.rowcount
+                conn.commit()
+                purged += deleted
+                if deleted < PURGE_BATCH_SIZE:
+                    return purged
+        finally:
+            cursor.close()
+
+
+class MemoryIdempotencyStore:
+    transactional = False
+
+    def __init__(self, maxsize=IDEMPOTENCY_MEMORY_MAXSIZE, ttl_seconds=IDEMPOTENCY_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, conn, scope, key) -> Optional[IdempotencyRecord]:
+        with self._lock:
+            entry = self._entries.get((scope, key))
+            if entry is None:
+                return None
+            expires_at, record = entry
+            if expires_at <= time.monotonic():
+                del self._entries[(scope, key)]
+                return None
+            self._entries.move_to_end((scope, key))
+            return record
+
+    def save(self, cursor, record: IdempotencyRecord):
+        pass
+
+    def saved(self, record: IdempotencyRecord):
+        now = time.monotonic()
+        with self._lock:
+            self._entries[(record.scope, record.key)] = (now + self.ttl, record)
+            self._entries.move_to_end((record.scope, record.key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def purge_expired(self, conn=None):
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for k in expired:
+                del self._entries[k]
+        return len(expired)
+
+
+_store = MemoryIdempotencyStore() if IDEMPOTENCY_BACKEND == "memory" else MySQLIdempotencyStore()
+
+
+def get_store():
+    return _store
+
+
+def set_store(store):
+    """Install another store implementing get/save/saved/purge_expired."""
+    global _store
+    _store = store
+
+
+def purge_expired(conn):
+    return _store.purge_expired(conn)
+
+
+def request_fingerprint(payload) -> str:
+    canonical = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class IdempotentRequest:
+    """One keyed POST: replay a stored response or record the new one.
+
+    Handlers call replay() before doing any work, save() on their cursor just
+    before commit, and saved() right after commit.
+    """
+
+    def __init__(self, scope: str, key: str, payload):
+        self.store = _store
+        self.record = IdempotencyRecord(scope, key, request_fingerprint(payload))
+
+    def replay(self, conn):
+        """The stored response for this key, or None if there is none yet."""
+        stored = self.store.get(conn, self.record.scope, self.record.key)
+        if stored is None:
+            return None
+        if stored.fingerprint != self.record.fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request body"
+            )
+        return JSONResponse(
+            status_code=stored.status_code,
+            content=stored.body,
+            headers={REPLAY_HEADER: "true"}
+        )
+
+    def save(self, cursor, status_code: int, body):
+        self.record.status_code = status_code
+        self.record.body = jsonable_encoder(body)
+        self.store.save(cursor, self.record)
+
+    def saved(self):
+        self.store.saved(self.record)
@@ -0,0 +1,113 @@
+"""Batched loading of listing sub-resources for the expanded property endpoints.
+
+Each relation is fetched with a single ``WHERE property_id IN (...)`` query
+covering every requested property, so expanding N listings costs one query
+per relation rather than one per listing.
+"""
+from fastapi import HTTPException, status
+
+from app.reference_data import get_amenities
+
+LISTING_RELATIONS = ("address", "photos", "amenities", "rules")
+
+MAX_LISTING_IDS = 100
+
+
+def parse_include(include):
+    """Split ?include=a,b into a tuple of known relations (400 on unknown names)."""
+    if not include:
+        return ()
+    requested = [name.strip() for name in include.split(",") if name.strip()]
+    unknown = sorted(set(requested) - set(LISTING_RELATIONS))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include: {', '.join(unknown)}; expected any of {', '.join(LISTING_RELATIONS)}"
+        )
+    return tuple(name for name in LISTING_RELATIONS if name in requested)
+
+
+def _fetch_grouped(cursor, query, property_ids):
+    placeholders = ", ".join(["%s"] * len(property_ids))
+    cursor.execute(query.format(ids=placeholders), list(property_ids))
+    grouped = {property_id: [] for property_id in property_ids}
+    for row in cursor.fetchall():
+        grouped[row['property_id']].append(row)
+    return grouped
+
+
+def _load_address(conn, cursor, property_ids):
+    grouped = _fetch_grouped(cursor, """
+        SELECT * FROM property_addresses
+        WHERE property_id IN ({ids})
+        ORDER BY property_id, address_id
+    """, property_ids)
+    return {property_id: rows[0] if rows else None for property_id, rows in grouped.items()}
+
+
+def _load_photos(conn, cursor, property_ids):
+    return _fetch_grouped(cursor, """
+        SELECT photo_id, property_id, photo_url, caption,
+               is_cover_photo, display_order, uploaded_at
+        FROM property_photos
+        WHERE property_id IN ({ids})
+        ORDER BY property_id, display_order, photo_id
+    """, property_ids)
+
+
+def _load_amenities(conn, cursor, property_ids):
+    grouped = _fetch_grouped(cursor, """
+        SELECT property_id, amenity_id
+        FROM property_amenities
+        WHERE property_id IN ({ids})
+    """, property_ids)
+    # Names come from the reference cache instead of a join
+    amenities = get_amenities(conn)
+    result = {}
+    for property_id, rows in grouped.items():
+        result[property_id] = []
+        for row in rows:
+            amenity = amenities.get(row['amenity_id'])
+            if not amenity or not amenity['is_active']:
+                continue
+            result[property_id].append({
+                "property_id": property_id,
+                "amenity_id": row['amenity_id'],
+                "amenity_name": amenity['amenity_name'],
+                "amenity_category": amenity['amenity_category'],
+                "icon_url": amenity['icon_url'],
+            })
+    return result
+
+
+def _load_rules(conn, cursor, property_ids):
+    return _fetch_grouped(cursor, """
+        SELECT rule_id, property_id, rule_text, created_at
+        FROM house_rules
+        WHERE property_id IN ({ids})
+        ORDER BY property_id, created_at DESC, rule_id DESC
+    """, property_ids)
+
+
+_LOADERS = {
+    "address": _load_address,
+    "photos": _load_photos,
+    "amenities": _load_amenities,
+    "rules": _load_rules,
+}
+
+
+def attach_relations(conn, listings, include):
+    """Load each included relation for all listings and set it on each row."""
+    if not listings or not include:
+        return listings
+    property_ids = [listing['property_id'] for listing in listings]
+    cursor = conn.cursor(dictionary=True)
+    try:
+        for relation in include:
+            loaded = _LOADERS[relation](conn, cursor, property_ids)
+            for listing in listings:
+                listing[relation] = loaded[listing['property_id']]
+    finally:
+        cursor.close()
+    return listings
@@ -1,4 +1,7 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
+from app import booking_lifecycle, holds, host_stats, idempotency, tasks
+from app.db import get_pool_stats
+from app.Token.verify_api import verify_token
 # from app.routers import airlines,aircraft_types,countries,cities,airports,routes,flights,flight_schedules,flight_prices,users,passenger_profiles,bookings,booking_items,payment_transactions,user_searches,reviews,promotions,user_sessions
 from app.routers import users
 from app.routers import user_addresses
@@ -10,6 +13,9 @@ from app.routers import property_amenities
 from app.routers import property_photos
 from app.routers import house_rules
 from app.routers import bookings
+from app.routers import reviews
+from app.routers import host_earnings
+from app.routers import property_availability
 app = FastAPI(
     title="airbnb_system api",
     description="API for airbnb_system",
@@ -27,4 +33,51 @@ app.include_router(amenities.router)
 app.include_router(property_amenities.router)
 app.include_router(property_photos.router)
 app.include_router(house_rules.router)
-app.include_router(bookings.router)
\ No newline at end of file
+app.include_router(bookings.router)
+app.include_router(reviews.router)
+app.include_router(host_earnings.router)
+app.include_router(property_availability.router)
+
+tasks.register(
+    "host_stats_reconcile",
+    host_stats.RECONCILE_INTERVAL_SECONDS,
+    host_stats.reconcile,
+    initial_delay_seconds=60,
+)
+tasks.register(
+    "booking_lifecycle",
+    booking_lifecycle.LIFECYCLE_INTERVAL_SECONDS,
+    booking_lifecycle.run_lifecycle,
+    initial_delay_seconds=30,
+)
+tasks.register(
+    "hold_expiry",
+    holds.SWEEP_INTERVAL_SECONDS,
+    holds.sweep,
+)
+tasks.register(
+    "idempotency_purge",
+    idempotency.PURGE_INTERVAL_SECONDS,
+    idempotency.purge_expired,
+    initial_delay_seconds=120,
+)
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    await tasks.start_all()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await tasks.stop_all()
+
+
+@app.get("/health/db-pool", tags=["health"], dependencies=[Depends(verify_token)])
+async def db_pool_stats():
+    return get_pool_stats()
+
+
+@app.get("/health/tasks", tags=["health"], dependencies=[Depends(verify_token)])
+async def background_task_status():
+    return tasks.task_status()
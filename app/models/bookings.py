@@ -17,6 +17,10 @@ class PaymentStatus(str, Enum):
     refunded = "refunded"
     failed = "failed"
 
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
 class BookingBase(BaseModel):
     property_id: int
     guest_id: int
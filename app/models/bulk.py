@@ -0,0 +1,34 @@
+from enum import Enum
+from typing import List, Optional
+from pydantic import BaseModel
+
+class BulkItemStatus(str, Enum):
+    created = "created"
+    skipped = "skipped"
+    failed = "failed"
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: BulkItemStatus
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+class BulkCreateResponse(BaseModel):
+    property_id: int
+    created: int
+    skipped: int
+    failed: int
+    results: List[BulkItemResult]
+
+    @classmethod
+    def from_results(cls, property_id: int, results: List[BulkItemResult]):
+        counts = {s: 0 for s in BulkItemStatus}
+        for result in results:
+            counts[result.status] += 1
+        return cls(
+            property_id=property_id,
+            created=counts[BulkItemStatus.created],
+            skipped=counts[BulkItemStatus.skipped],
+            failed=counts[BulkItemStatus.failed],
+            results=results
+        )
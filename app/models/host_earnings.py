@@ -0,0 +1,54 @@
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class PayoutStatus(str, Enum):
+    pending = "pending"
+    processing = "processing"
+    completed = "completed"
+    failed = "failed"
+
+class HostEarningBase(BaseModel):
+    host_id: int
+    booking_id: int
+    gross_amount: Decimal = Field(..., ge=0, max_digits=10, decimal_places=2)
+    platform_fee: Decimal = Field(..., ge=0, max_digits=10, decimal_places=2)
+    net_amount: Decimal = Field(..., max_digits=10, decimal_places=2)
+    payout_status: PayoutStatus = PayoutStatus.pending
+    payout_date: Optional[date] = None
+    payout_method: Optional[str] = Field(None, max_length=50)
+
+class HostEarningCreate(HostEarningBase):
+    pass
+
+class HostEarningUpdate(BaseModel):
+    gross_amount: Optional[Decimal] = Field(None, ge=0, max_digits=10, decimal_places=2)
+    platform_fee: Optional[Decimal] = Field(None, ge=0, max_digits=10, decimal_places=2)
+    net_amount: Optional[Decimal] = Field(None, max_digits=10, decimal_places=2)
+    payout_status: Optional[PayoutStatus] = None
+    payout_date: Optional[date] = None
+    payout_method: Optional[str] = Field(None, max_length=50)
+
+class HostEarningInDB(HostEarningBase):
+    earning_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class HostEarningResponse(HostEarningInDB):
+    pass
+
+class HostDashboardResponse(BaseModel):
+    host_id: int
+    first_name: str
+    last_name: str
+    total_properties: int
+    completed_bookings: int
+    net_earnings: Decimal
+    average_rating: Optional[float] = None
+    rating_count: int
+    updated_at: Optional[datetime] = None
+    reconciled_at: Optional[datetime] = None
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import List, Optional
+from pydantic import BaseModel, Field, field_validator
 
 class HouseRuleBase(BaseModel):
     property_id: int
@@ -23,4 +23,15 @@ class HouseRuleInDB(HouseRuleBase):
         }
 
 class HouseRuleResponse(HouseRuleInDB):
-    pass
\ No newline at end of file
+    pass
+
+class HouseRuleBulkCreate(BaseModel):
+    property_id: int
+    rules: List[str] = Field(..., min_length=1, max_length=500)
+
+    @field_validator('rules')
+    def validate_rule_text(cls, rules):
+        for rule_text in rules:
+            if not 1 <= len(rule_text) <= 2000:
+                raise ValueError('Each rule must be between 1 and 2000 characters')
+        return rules
@@ -1,8 +1,12 @@
 from datetime import time, datetime, timedelta
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field, validator, field_validator
 from decimal import Decimal
+from app.models.house_rules import HouseRuleResponse
+from app.models.property_addresses import PropertyAddressResponse
+from app.models.property_amenities import PropertyAmenityResponse
+from app.models.property_photos import PropertyPhotoResponse
 
 class PropertyType(str, Enum):
     entire_place = "entire_place"
@@ -77,6 +81,11 @@ class PropertyInDB(PropertyBase):
         }
 
 class PropertyResponse(PropertyInDB):
+    host_first_name: Optional[str] = None
+    host_last_name: Optional[str] = None
+    category_name: Optional[str] = None
+    relevance: Optional[float] = None
+
     @field_validator('check_in_time', 'check_out_time', mode='before')
     def convert_times(cls, value):
         if value is None:
@@ -92,4 +101,26 @@ class PropertyResponse(PropertyInDB):
         json_encoders = {
             time: lambda v: v.strftime('%H:%M') if v else None,
             Decimal: lambda v: str(v)
-        }
\ No newline at end of file
+        }
+class FacetCount(BaseModel):
+    value: str
+    label: Optional[str] = None
+    count: int
+
+class PriceBucketCount(BaseModel):
+    min_price: Decimal
+    max_price: Decimal
+    count: int
+
+class PropertyFacetsResponse(BaseModel):
+    total: int
+    categories: List[FacetCount]
+    property_types: List[FacetCount]
+    price_buckets: List[PriceBucketCount]
+    amenities: List[FacetCount]
+
+class PropertyListingResponse(PropertyResponse):
+    address: Optional[PropertyAddressResponse] = None
+    photos: Optional[List[PropertyPhotoResponse]] = None
+    amenities: Optional[List[PropertyAmenityResponse]] = None
+    rules: Optional[List[HouseRuleResponse]] = None
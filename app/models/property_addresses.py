@@ -38,4 +38,26 @@ class PropertyAddressInDB(PropertyAddressBase):
         }
 
 class PropertyAddressResponse(PropertyAddressInDB):
-    pass
\ No newline at end of file
+    pass
+
+class PropertyLocationResult(BaseModel):
+    address_id: int
+    property_id: int
+    title: str
+    property_type: str
+    category_id: int
+    price_per_night: Decimal
+    max_guests: int
+    bedrooms: int
+    bathrooms: Decimal
+    city: str
+    country: str
+    neighborhood: Optional[str] = None
+    latitude: Decimal
+    longitude: Decimal
+    distance_km: float
+
+    class Config:
+        json_encoders = {
+            Decimal: lambda v: str(v)
+        }
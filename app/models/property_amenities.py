@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class PropertyAmenityBase(BaseModel):
     property_id: int
@@ -18,4 +18,8 @@ class PropertyAmenityResponse(PropertyAmenityBase):
     icon_url: Optional[str] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class PropertyAmenityBulkCreate(BaseModel):
+    property_id: int
+    amenity_ids: List[int] = Field(..., min_length=1, max_length=500)
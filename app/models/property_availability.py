@@ -0,0 +1,73 @@
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+
+class PropertyAvailabilityBase(BaseModel):
+    property_id: int
+    available_date: date
+    is_available: bool = True
+    price_override: Optional[Decimal] = Field(None, ge=0, max_digits=10, decimal_places=2)
+    minimum_nights_override: Optional[int] = Field(None, ge=1)
+    notes: Optional[str] = None
+
+class PropertyAvailabilityCreate(PropertyAvailabilityBase):
+    pass
+
+class PropertyAvailabilityResponse(PropertyAvailabilityBase):
+    availability_id: int
+
+    class Config:
+        from_attributes = True
+
+class CalendarDayStatus(str, Enum):
+    available = "available"
+    blocked = "blocked"
+    booked = "booked"
+
+class CalendarRun(BaseModel):
+    start_date: date
+    end_date: date  # inclusive
+    days: int
+    status: CalendarDayStatus
+    price: Decimal
+    minimum_nights: int
+
+class PropertyCalendarResponse(BaseModel):
+    property_id: int
+    start_date: date
+    end_date: date  # inclusive
+    runs: List[CalendarRun]
+
+class AvailabilityRangeAction(str, Enum):
+    block = "block"
+    unblock = "unblock"
+    set_price = "set_price"
+
+class AvailabilityRangeUpdate(BaseModel):
+    property_ids: List[int] = Field(..., min_length=1, max_length=500)
+    start_date: date
+    end_date: date  # inclusive
+    action: AvailabilityRangeAction
+    # set_price with no price clears the override
+    price_override: Optional[Decimal] = Field(None, ge=0, max_digits=10, decimal_places=2)
+    notes: Optional[str] = None
+
+    @model_validator(mode='after')
+    def validate_range(self):
+        if self.end_date < self.start_date:
+            raise ValueError('end_date must not be before start_date')
+        if (self.end_date - self.start_date).days >= 366:
+            raise ValueError('Ranges are limited to 366 days')
+        if self.price_override is not None and self.action != AvailabilityRangeAction.set_price:
+            raise ValueError('price_override is only used with the set_price action')
+        return self
+
+class AvailabilityRangeResponse(BaseModel):
+    action: AvailabilityRangeAction
+    property_ids: List[int]
+    start_date: date
+    end_date: date
+    days: int
+    property_dates: int
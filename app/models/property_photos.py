@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 class PropertyPhotoBase(BaseModel):
@@ -29,4 +29,14 @@ class PropertyPhotoInDB(PropertyPhotoBase):
         }
 
 class PropertyPhotoResponse(PropertyPhotoInDB):
-    pass
\ No newline at end of file
+    pass
+
+class PropertyPhotoBulkItem(BaseModel):
+    photo_url: str = Field(..., max_length=500)
+    caption: Optional[str] = Field(None, max_length=255)
+    is_cover_photo: bool = False
+    display_order: int = 0
+
+class PropertyPhotoBulkCreate(BaseModel):
+    property_id: int
+    photos: List[PropertyPhotoBulkItem] = Field(..., min_length=1, max_length=500)
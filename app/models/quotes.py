@@ -0,0 +1,50 @@
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+
+class QuoteRequest(BaseModel):
+    check_in_date: date
+    check_out_date: date
+    num_guests: int = Field(1, gt=0)
+
+    @model_validator(mode='after')
+    def validate_dates(self):
+        if self.check_out_date <= self.check_in_date:
+            raise ValueError('check_out_date must be after check_in_date')
+        if (self.check_out_date - self.check_in_date).days > 365:
+            raise ValueError('Quotes are limited to stays of 365 nights')
+        return self
+
+class NightlyPrice(BaseModel):
+    night: date
+    price: Decimal
+
+class PriceQuote(BaseModel):
+    property_id: int
+    check_in_date: date
+    check_out_date: date
+    nights: int
+    nightly_prices: Optional[List[NightlyPrice]] = None
+    subtotal: Decimal
+    cleaning_fee: Decimal
+    service_fee: Decimal
+    taxes: Decimal
+    total_amount: Decimal
+    minimum_nights: int
+    maximum_nights: int
+    unavailable_dates: List[date]
+    booked: bool = False  # an active booking or unexpired hold overlaps the stay
+    bookable: bool
+
+class BatchQuoteRequest(QuoteRequest):
+    property_ids: List[int] = Field(..., min_length=1, max_length=100)
+    include_nightly: bool = False
+
+class UnquotedProperty(BaseModel):
+    property_id: int
+    detail: str
+
+class BatchQuoteResponse(BaseModel):
+    quotes: List[PriceQuote]
+    unquoted: List[UnquotedProperty]
@@ -0,0 +1,58 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class ReviewType(str, Enum):
+    guest_to_host = "guest_to_host"
+    host_to_guest = "host_to_guest"
+
+class ReviewBase(BaseModel):
+    booking_id: int
+    reviewer_id: int
+    reviewee_id: int
+    review_type: ReviewType
+    rating: int = Field(..., ge=1, le=5)
+    review_text: Optional[str] = None
+    cleanliness_rating: Optional[int] = Field(None, ge=1, le=5)
+    communication_rating: Optional[int] = Field(None, ge=1, le=5)
+    check_in_rating: Optional[int] = Field(None, ge=1, le=5)
+    accuracy_rating: Optional[int] = Field(None, ge=1, le=5)
+    location_rating: Optional[int] = Field(None, ge=1, le=5)
+    value_rating: Optional[int] = Field(None, ge=1, le=5)
+    is_public: bool = True
+
+class ReviewCreate(ReviewBase):
+    pass
+
+class ReviewUpdate(BaseModel):
+    rating: Optional[int] = Field(None, ge=1, le=5)
+    review_text: Optional[str] = None
+    cleanliness_rating: Optional[int] = Field(None, ge=1, le=5)
+    communication_rating: Optional[int] = Field(None, ge=1, le=5)
+    check_in_rating: Optional[int] = Field(None, ge=1, le=5)
+    accuracy_rating: Optional[int] = Field(None, ge=1, le=5)
+    location_rating: Optional[int] = Field(None, ge=1, le=5)
+    value_rating: Optional[int] = Field(None, ge=1, le=5)
+    is_public: Optional[bool] = None
+
+class ReviewInDB(ReviewBase):
+    review_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ReviewResponse(ReviewInDB):
+    pass
+
+class PropertyRatingSummary(BaseModel):
+    property_id: int
+    review_count: int = 0
+    average_rating: Optional[float] = None
+    cleanliness_rating: Optional[float] = None
+    communication_rating: Optional[float] = None
+    check_in_rating: Optional[float] = None
+    accuracy_rating: Optional[float] = None
+    location_rating: Optional[float] = None
+    value_rating: Optional[float] = None
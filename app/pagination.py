@@ -0,0 +1,85 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException, status
+
+# List endpoints keep their plain JSON array bodies; the cursor for the next
+# page travels in this response header instead.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _to_json(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(*values):
+    """Encode the sort-key values of the last row into an opaque cursor."""
+    payload = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _from_json(value, kind):
+    """Cursor value checked against the sort column's type, or None if it doesn't fit."""
+    if kind is int:
+        # bool is an int subclass but never a valid key
+        return value if isinstance(value, int) and not isinstance(value, bool) else None
+    if kind is datetime and isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+def decode_cursor(cursor: str, *types):
+    """Decode a cursor produced by encode_cursor into its sort-key values.
+
+    `types` gives the type of each sort column in order (int or datetime);
+    a cursor with the wrong number of values or a value of the wrong type is
+    rejected with 400 instead of reaching the database.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, binascii.Error):
+        values = None
+    if isinstance(values, list) and len(values) == len(types):
+        values = [_from_json(value, kind) for value, kind in zip(values, types)]
+        if None not in values:
+            return values
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+
+def keyset_condition(columns, values, descending=False):
+    """Build the WHERE fragment selecting rows strictly after `values`.
+
+    For columns (a, b) in ascending order this yields
+    ``(a > %s OR (a = %s AND b > %s))``, which MySQL can answer with a range
+    scan on an index over (a, b) instead of counting past OFFSET rows.
+    """
+    if len(columns) != len(values):
+        raise ValueError(f"keyset over {len(columns)} columns given {len(values)} values")
+    op = "<" if descending else ">"
+    clauses = []
+    params = []
+    for i, column in enumerate(columns):
+        parts = [f"{prev} = %s" for prev in columns[:i]] + [f"{column} {op} %s"]
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(values[:i] + [values[i]])
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def set_next_cursor(response, rows, limit, keys):
+    """Expose the cursor for the page after `rows` when the page was full."""
+    if rows and len(rows) >= limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*(last[k] for k in keys))
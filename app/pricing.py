@@ -0,0 +1,286 @@
+"""Server-side price quotes from property prices, pricing_rules and overrides.
+
+Nightly price for each night of a stay:
+
+1. start from properties.price_per_night;
+2. apply every active pricing rule whose [start_date, end_date] covers the
+   night: percentage rules compound multiplicatively, fixed_amount rules are
+   added afterwards;
+3. a property_availability.price_override for that night replaces the result.
+
+The fee is then service_fee_percentage of (nights + cleaning fee). The
+arithmetic is vectorized with NumPy over a (properties x nights) price
+matrix, so one quote and a whole result page go through the same code. Each
+property's resolved rule set (prices, fees and rule arrays) is kept in a
+small TTL cache; availability overrides are read per quote because they are
+date-specific.
+"""
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from app.cache import TTLCache
+from app.db import transaction_started
+
+PRICING_CACHE_TTL = float(os.getenv("PRICING_CACHE_TTL", "60"))
+PRICING_CACHE_SIZE = int(os.getenv("PRICING_CACHE_SIZE", "2048"))
+
+CENT = Decimal("0.01")
+
+_rule_sets = TTLCache(PRICING_CACHE_TTL, maxsize=PRICING_CACHE_SIZE)
+
+
+class RuleSet:
+    """A property's pricing inputs with its active rules as parallel arrays."""
+
+    __slots__ = (
+        "property_id", "price_per_night", "cleaning_fee", "service_fee_percentage",
+        "minimum_nights", "maximum_nights", "max_guests",
+        "rule_start", "rule_end", "rule_is_percentage", "rule_value", "rule_min_nights",
+    )
+
+    def __init__(self, row, rules):
+        self.property_id = row['property_id']
+        self.price_per_night = float(row['price_per_night'])
+        self.cleaning_fee = float(row['cleaning_fee'] or 0)
+        self.service_fee_percentage = float(row['service_fee_percentage'] or 0)
+        self.minimum_nights = row['minimum_nights']
+        self.maximum_nights = row['maximum_nights']
+        self.max_guests = row['max_guests']
+        self.rule_start = np.array([r['start_date'].toordinal() for r in rules], dtype=np.int64)
+        self.rule_end = np.array([r['end_date'].toordinal() for r in rules], dtype=np.int64)
+        self.rule_is_percentage = np.array(
+            [r['price_modifier_type'] == 'percentage' for r in rules], dtype=bool
+        )
+        self.rule_value = np.array([float(r['price_modifier_value']) for r in rules], dtype=np.float64)
+        # 0 where a rule leaves the minimum stay alone
+        self.rule_min_nights = np.array(
+            [r['minimum_nights_override'] or 0 for r in rules], dtype=np.int64
+        )
+
+
+def load_rule_sets(conn, property_ids):
+    """Resolve rule sets for active properties in one query (no caching)."""
+    property_ids = list(dict.fromkeys(property_ids))
+    if not property_ids:
+        return {}
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT p.property_id, p.price_per_night, p.cleaning_fee, p.service_fee_percentage,
+                   p.minimum_nights, p.maximum_nights, p.max_guests,
+                   r.start_date, r.end_date, r.price_modifier_type,
+                   r.price_modifier_value, r.minimum_nights_override
+            FROM properties p
+            LEFT JOIN pricing_rules r
+                   ON r.property_id = p.property_id AND r.is_active = TRUE
+            WHERE p.property_id IN ({", ".join(["%s"] * len(property_ids))})
+              AND p.is_active = TRUE
+            ORDER BY p.property_id, r.rule_id
+        """, property_ids)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    grouped = {}
+    for row in rows:
+        base, rules = grouped.setdefault(row['property_id'], (row, []))
+        if row['start_date'] is not None:
+            rules.append(row)
+    return {property_id: RuleSet(base, rules) for property_id, (base, rules) in grouped.items()}
+
+
+def get_rule_sets(conn, property_ids):
+    """Cached rule sets for many properties; misses are loaded in one query."""
+    rule_sets = {}
+    missing = []
+    for property_id in dict.fromkeys(property_ids):
+        rule_set = _rule_sets.peek(property_id)
+        if rule_set is None:
+            missing.append(property_id)
+        else:
+            rule_sets[property_id] = rule_set
+    if missing:
+        since = transaction_started(conn)
+        loaded = load_rule_sets(conn, missing)
+        for property_id, rule_set in loaded.items():
+            _rule_sets.put(property_id, rule_set, since=since)
+        rule_sets.update(loaded)
+    return rule_sets
+
+
+def get_rule_set(conn, property_id: int):
+    """Cached rule set for one active property, or None."""
+    rule_set = _rule_sets.get(
+        property_id,
+        lambda: load_rule_sets(conn, [property_id]).get(property_id),
+        since=transaction_started(conn)
+    )
+    if rule_set is None:
+        # Don't let a miss hide a property created moments later
+        _rule_sets.invalidate(property_id)
+    return rule_set
+
+
+def invalidate_rule_set(property_id=None):
+    """Drop cached rule sets after a write to properties or pricing_rules."""
+    _rule_sets.invalidate(property_id)
+
+
+def load_overrides(conn, property_ids, check_in: date, check_out: date):
+    """property_availability rows for the nights [check_in, check_out), by property."""
+    property_ids = list(dict.fromkeys(property_ids))
+    overrides = {property_id: [] for property_id in property_ids}
+    if not property_ids:
+        return overrides
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT property_id, available_date, is_available,
+                   price_override, minimum_nights_override
+            FROM property_availability
+            WHERE property_id IN ({", ".join(["%s"] * len(property_ids))})
+              AND available_date >= %s AND available_date < %s
+        """, property_ids + [check_in, check_out])
+        for row in cursor.fetchall():
+            overrides[row['property_id']].append(row)
+    finally:
+        cursor.close()
+    return overrides
+
+
+def price_matrix(rule_sets, nights, overrides):
+    """Final nightly prices as a (properties x nights) array.
+
+    rule_sets is a list of RuleSet, overrides the matching list of
+    property_availability rows. Every property's rules are stacked into one
+    (rules x nights) coverage matrix and folded into its row with ufunc.at,
+    so the whole page is priced in a handful of array operations.
+    """
+    count = len(rule_sets)
+    prices = np.repeat(
+        np.array([rs.price_per_night for rs in rule_sets], dtype=np.float64)[:, None],
+        nights.size, axis=1
+    )
+    owners = np.concatenate(
+        [np.full(rs.rule_start.size, i, dtype=np.int64) for i, rs in enumerate(rule_sets)]
+    ) if count else np.empty(0, dtype=np.int64)
+    if owners.size:
+        start = np.concatenate([rs.rule_start for rs in rule_sets])
+        end = np.concatenate([rs.rule_end for rs in rule_sets])
+        is_percentage = np.concatenate([rs.rule_is_percentage for rs in rule_sets])
+        value = np.concatenate([rs.rule_value for rs in rule_sets])
+        covers = (nights[None, :] >= start[:, None]) & (nights[None, :] <= end[:, None])
+        factors = np.ones((count, nights.size))
+        np.multiply.at(factors, owners, np.where(covers & is_percentage[:, None], 1 + value[:, None] / 100, 1.0))
+        fixed = np.zeros((count, nights.size))
+        np.add.at(fixed, owners, (covers & ~is_percentage[:, None]) * value[:, None])
+        prices = prices * factors + fixed
+    prices = np.maximum(prices, 0.0)
+
+    first_night = int(nights[0])
+    for i, rows in enumerate(overrides):
+        for row in rows:
+            if row['price_override'] is not None:
+                prices[i, row['available_date'].toordinal() - first_night] = float(row['price_override'])
+    return prices
+
+
+def minimum_nights_for(rule_set: RuleSet, check_in_ordinal: int, overrides):
+    """Minimum stay that applies to a check-in date: day override, then rule, then property."""
+    for row in overrides:
+        if row['available_date'].toordinal() == check_in_ordinal and row['minimum_nights_override']:
+            return row['minimum_nights_override']
+    if rule_set.rule_start.size:
+        applies = (rule_set.rule_start <= check_in_ordinal) & (rule_set.rule_end >= check_in_ordinal) \
+                  & (rule_set.rule_min_nights > 0)
+        if applies.any():
+            return int(rule_set.rule_min_nights[applies].max())
+    return rule_set.minimum_nights
+
+
+def minimum_nights_by_day(rule_set: RuleSet, nights, overrides):
+    """Minimum stay for a check-in on each night, vectorized over nights."""
+    minimums = np.full(nights.shape, rule_set.minimum_nights, dtype=np.int64)
+    if rule_set.rule_start.size:
+        covers = (nights[None, :] >= rule_set.rule_start[:, None]) & \
+                 (nights[None, :] <= rule_set.rule_end[:, None]) & \
+                 (rule_set.rule_min_nights[:, None] > 0)
+        ruled = np.where(covers, rule_set.rule_min_nights[:, None], 0).max(axis=0)
+        minimums = np.where(ruled > 0, ruled, minimums)
+    first_night = int(nights[0])
+    for row in overrides:
+        if row['minimum_nights_override']:
+            minimums[row['available_date'].toordinal() - first_night] = row['minimum_nights_override']
+    return minimums
+
+
+def round_cents(amounts):
+    """Round non-negative amounts to whole cents, half up."""
+    return np.floor(amounts * 100 + 0.5).astype(np.int64)
+
+
+def money(cents) -> Decimal:
+    return (Decimal(int(cents)) / 100).quantize(CENT)
+
+
+def build_quotes(rule_sets, check_in: date, check_out: date, overrides, include_nightly=True, booked=frozenset()):
+    """Quote dicts (see PriceQuote) for several properties over the same stay.
+
+    Totals for all properties come from one pass over the price matrix, in
+    integer cents so every quote adds up exactly. `booked` holds the ids with
+    an active booking over the stay (see app.calendar.booked_property_ids).
+    """
+    start = check_in.toordinal()
+    nights = np.arange(start, check_out.toordinal(), dtype=np.int64)
+    override_rows = [overrides.get(rs.property_id, []) for rs in rule_sets]
+
+    nightly_cents = round_cents(price_matrix(rule_sets, nights, override_rows))
+    subtotal_cents = nightly_cents.sum(axis=1)
+    cleaning_cents = round_cents(np.array([rs.cleaning_fee for rs in rule_sets], dtype=np.float64))
+    # service_fee_percentage is DECIMAL(5,2): as hundredths of a percent the
+    # fee is exact integer math, rounded half up like the Decimal version
+    fee_basis_points = np.array(
+        [round(rs.service_fee_percentage * 100) for rs in rule_sets], dtype=np.int64
+    )
+    service_cents = ((subtotal_cents + cleaning_cents) * fee_basis_points + 5000) // 10000
+    total_cents = subtotal_cents + cleaning_cents + service_cents
+
+    quotes = []
+    for i, rule_set in enumerate(rule_sets):
+        unavailable = sorted(row['available_date'] for row in override_rows[i] if not row['is_available'])
+        minimum_nights = minimum_nights_for(rule_set, start, override_rows[i])
+        quote = {
+            "property_id": rule_set.property_id,
+            "check_in_date": check_in,
+            "check_out_date": check_out,
+            "nights": int(nights.size),
+            "subtotal": money(subtotal_cents[i]),
+            "cleaning_fee": money(cleaning_cents[i]),
+            "service_fee": money(service_cents[i]),
+            "taxes": Decimal("0.00"),
+            "total_amount": money(total_cents[i]),
+            "minimum_nights": minimum_nights,
+            "maximum_nights": rule_set.maximum_nights,
+            "unavailable_dates": unavailable,
+            "booked": rule_set.property_id in booked,
+            "bookable": not unavailable and rule_set.property_id not in booked
+                        and minimum_nights <= nights.size <= rule_set.maximum_nights,
+        }
+        if include_nightly:
+            quote["nightly_prices"] = [
+                {"night": check_in + timedelta(days=n), "price": money(cents)}
+                for n, cents in enumerate(nightly_cents[i])
+            ]
+        quotes.append(quote)
+    return quotes
+
+
+def build_quote(rule_set: RuleSet, check_in: date, check_out: date, overrides, booked=False):
+    """Quote for a single property; overrides are that property's rows."""
+    return build_quotes(
+        [rule_set], check_in, check_out, {rule_set.property_id: overrides},
+        booked={rule_set.property_id} if booked else frozenset()
+    )[0]
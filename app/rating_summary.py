@@ -0,0 +1,141 @@
+"""Materialized per-property rating totals for guest_to_host reviews.
+
+property_rating_summary keeps running sums and counts so reads never have to
+aggregate over reviews. Review writes call apply_review() on the same
+connection before committing, which keeps the totals transactionally in step
+with the reviews table. rebuild() recomputes rows from scratch and backs the
+command line entry point:
+
+    python -m app.rating_summary                 # every property
+    python -m app.rating_summary --property-id 7 --property-id 9
+"""
+import argparse
+
+import mysql.connector
+
+from app.db import DB_CONFIG
+
+SUB_RATINGS = ("cleanliness", "communication", "check_in", "accuracy", "location", "value")
+
+SUMMARY_COLUMNS = ["review_count", "rating_sum"] + [
+    column for name in SUB_RATINGS for column in (f"{name}_sum", f"{name}_count")
+]
+
+# Summary rows are only kept for reviews guests leave on a stay
+SUMMARY_REVIEW_TYPE = "guest_to_host"
+
+_AGGREGATES = ",\n           ".join(
+    ["COUNT(*)", "SUM(r.rating)"]
+    + [f"COALESCE(SUM(r.{n}_rating), 0), COUNT(r.{n}_rating)" for n in SUB_RATINGS]
+)
+
+REBUILD_QUERY = f"""
+    INSERT INTO property_rating_summary (property_id, {", ".join(SUMMARY_COLUMNS)})
+    SELECT b.property_id,
+           {_AGGREGATES}
+    FROM reviews r
+    JOIN bookings b ON b.booking_id = r.booking_id
+    WHERE r.review_type = '{SUMMARY_REVIEW_TYPE}'{{where}}
+    GROUP BY b.property_id
+"""
+
+
+def review_deltas(review, sign=1):
+    """Column increments contributed by one review (sign=-1 to retract it)."""
+    deltas = {"review_count": sign, "rating_sum": sign * review["rating"]}
+    for name in SUB_RATINGS:
+        value = review.get(f"{name}_rating")
+        deltas[f"{name}_sum"] = sign * value if value is not None else 0
+        deltas[f"{name}_count"] = sign if value is not None else 0
+    return deltas
+
+
+def apply_review(cursor, property_id: int, review, sign=1):
+    """Add (or with sign=-1 retract) one review in the property's summary row.
+
+    Runs on the caller's cursor and does not commit, so the summary changes
+    together with the review write it accompanies.
+    """
+    if review["review_type"] != SUMMARY_REVIEW_TYPE:
+        return
+    deltas = review_deltas(review, sign)
+    cursor.execute(f"""
+        INSERT INTO property_rating_summary (property_id, {", ".join(SUMMARY_COLUMNS)})
+        VALUES ({", ".join(["%s"] * (len(SUMMARY_COLUMNS) + 1))})
+        ON DUPLICATE KEY UPDATE
+        {", ".join(f"{c} = {c} + VALUES({c})" for c in SUMMARY_COLUMNS)}
+    """, [property_id] + [deltas[c] for c in SUMMARY_COLUMNS])
+
+
+def summary_from_row(property_id: int, row):
+    """Turn a summary row (or None) into averages for PropertyRatingSummary."""
+    summary = {"property_id": property_id, "review_count": 0, "average_rating": None}
+    summary.update({f"{name}_rating": None for name in SUB_RATINGS})
+    if not row or not row["review_count"]:
+        return summary
+    summary["review_count"] = row["review_count"]
+    summary["average_rating"] = round(row["rating_sum"] / row["review_count"], 2)
+    for name in SUB_RATINGS:
+        if row[f"{name}_count"]:
+            summary[f"{name}_rating"] = round(row[f"{name}_sum"] / row[f"{name}_count"], 2)
+    return summary
+
+
+def get_summary(conn, property_id: int):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(
+            "SELECT * FROM property_rating_summary WHERE property_id = %s",
+            (property_id,)
+        )
+        return summary_from_row(property_id, cursor.fetchone())
+    finally:
+        cursor.close()
+
+
+def rebuild(conn, property_ids=None):
+    """Recompute summary rows from reviews in one transaction.
+
+    Returns the number of properties that ended up with a summary row.
+    """
+    cursor = conn.cursor()
+    try:
+        if property_ids:
+            placeholders = ", ".join(["%s"] * len(property_ids))
+            cursor.execute(
+                f"DELETE FROM property_rating_summary WHERE property_id IN ({placeholders})",
+                list(property_ids)
+            )
+            cursor.execute(
+                REBUILD_QUERY.format(where=f" AND b.property_id IN ({placeholders})"),
+                list(property_ids)
+            )
+        else:
+            cursor.execute("DELETE FROM property_rating_summary")
+            cursor.execute(REBUILD_QUERY.format(where=""))
+        rebuilt = cursor.rowcount
+        conn.commit()
+        return rebuilt
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild property_rating_summary from reviews.")
+    parser.add_argument("--property-id", type=int, action="append", dest="property_ids",
+                        help="limit the rebuild to this property (repeatable)")
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        rebuilt = rebuild(conn, args.property_ids)
+    finally:
+        conn.close()
+    print(f"rebuilt rating summary for {rebuilt} properties")
+
+
+if __name__ == "__main__":
+    main()
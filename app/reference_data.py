@@ -0,0 +1,52 @@
+import os
+
+from app.cache import TTLCache
+from app.db import transaction_started
+
+# Reference tables are tiny and change rarely, so each one is cached whole.
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "300"))
+
+_cache = TTLCache(ttl_seconds=REFERENCE_CACHE_TTL)
+
+
+def _load_table(conn, query, key):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(query)
+        return {row[key]: row for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def get_categories(conn):
+    """All property categories (active or not) keyed by category_id."""
+    return _cache.get(
+        "property_categories",
+        lambda: _load_table(conn, "SELECT * FROM property_categories", "category_id"),
+        since=transaction_started(conn)
+    )
+
+
+def get_category(conn, category_id: int):
+    return get_categories(conn).get(category_id)
+
+
+def invalidate_categories():
+    _cache.invalidate("property_categories")
+
+
+def get_amenities(conn):
+    """All amenities (active or not) keyed by amenity_id."""
+    return _cache.get(
+        "amenities",
+        lambda: _load_table(conn, "SELECT * FROM amenities", "amenity_id"),
+        since=transaction_started(conn)
+    )
+
+
+def get_amenity(conn, amenity_id: int):
+    return get_amenities(conn).get(amenity_id)
+
+
+def invalidate_amenities():
+    _cache.invalidate("amenities")
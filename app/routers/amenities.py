@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Header
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Response
 from typing import Optional
-from app.db import get_connection
+from app.db import get_db, db_bound
+from app.pagination import decode_cursor, set_next_cursor
+from app.reference_data import get_amenities, get_amenity, invalidate_amenities
 from app.models.amenities import AmenityCreate,AmenityUpdate,AmenityInDB, AmenityResponse
 from app.Token.verify_api import verify_token
 from datetime import datetime
@@ -13,44 +15,41 @@ router = APIRouter(prefix="/amenities", tags=["Amenities"], dependencies=[Depend
 
 
 @router.get("/", response_model=List[AmenityResponse])
-async def get_all_amenities(skip: int = 0, limit: int = 100):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    try:
-        cursor.execute("""
-            SELECT * FROM amenities 
-            WHERE is_active = TRUE
-            LIMIT %s OFFSET %s
-        """, (limit, skip))
-        amenities = cursor.fetchall()
-        return [AmenityResponse(**amenity) for amenity in amenities]
-    finally:
-        cursor.close()
-        conn.close()
+@db_bound
+def get_all_amenities(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    conn=Depends(get_db)
+):
+    # Served from the reference-data cache; the table is tiny and ordered by id
+    amenities = sorted(
+        (a for a in get_amenities(conn).values() if a['is_active']),
+        key=lambda a: a['amenity_id']
+    )
+    if page_cursor:
+        (last_amenity_id,) = decode_cursor(page_cursor, int)
+        page = [a for a in amenities if a['amenity_id'] > last_amenity_id][:limit]
+    else:
+        page = amenities[skip:skip + limit]
+    set_next_cursor(response, page, limit, ("amenity_id",))
+    return [AmenityResponse(**amenity) for amenity in page]
 
 @router.get("/{amenity_id}", response_model=AmenityResponse)
-async def get_amenity_by_id(amenity_id: int):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    try:
-        cursor.execute("""
-            SELECT * FROM amenities 
-            WHERE amenity_id = %s
-        """, (amenity_id,))
-        amenity = cursor.fetchone()
-        if not amenity:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Amenity not found"
-            )
-        return AmenityResponse(**amenity)
-    finally:
-        cursor.close()
-        conn.close()
+@db_bound
+def get_amenity_by_id(amenity_id: int, conn=Depends(get_db)):
+    amenity = get_amenity(conn, amenity_id)
+    if not amenity:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Amenity not found"
+        )
+    return AmenityResponse(**amenity)
 
 @router.post("/", response_model=AmenityResponse, status_code=status.HTTP_201_CREATED)
-async def create_amenity(amenity: AmenityCreate):
-    conn = get_connection()
+@db_bound
+def create_amenity(amenity: AmenityCreate, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         # Check if amenity name already exists
@@ -78,6 +77,7 @@ async def create_amenity(amenity: AmenityCreate):
             amenity.is_active
         ))
         conn.commit()
+        invalidate_amenities()
         
         # Get the newly created amenity
         amenity_id = cursor.lastrowid
@@ -95,11 +95,10 @@ async def create_amenity(amenity: AmenityCreate):
         )
     finally:
         cursor.close()
-        conn.close()
 
 @router.put("/{amenity_id}", response_model=AmenityResponse)
-async def update_amenity(amenity_id: int, amenity: AmenityUpdate):
-    conn = get_connection()
+@db_bound
+def update_amenity(amenity_id: int, amenity: AmenityUpdate, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         # Check if amenity exists
@@ -156,6 +155,7 @@ async def update_amenity(amenity_id: int, amenity: AmenityUpdate):
         params.append(amenity_id)
         cursor.execute(query, params)
         conn.commit()
+        invalidate_amenities()
         
         # Return updated amenity
         cursor.execute("""
@@ -172,11 +172,10 @@ async def update_amenity(amenity_id: int, amenity: AmenityUpdate):
         )
     finally:
         cursor.close()
-        conn.close()
 
 @router.delete("/{amenity_id}", status_code=status.HTTP_200_OK)
-async def delete_amenity(amenity_id: int):
-    conn = get_connection()
+@db_bound
+def delete_amenity(amenity_id: int, conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         # Soft delete (recommended approach)
@@ -192,6 +191,7 @@ async def delete_amenity(amenity_id: int):
                 detail="Amenity not found"
             )
         conn.commit()
+        invalidate_amenities()
         return {"message": "Amenity deactivated successfully"}
     except Exception as e:
         conn.rollback()
@@ -200,5 +200,4 @@ async def delete_amenity(amenity_id: int):
             detail=f"Error deleting amenity: {str(e)}"
         )
     finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        cursor.close()
\ No newline at end of file
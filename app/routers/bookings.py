@@ -1,10 +1,22 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from datetime import time, timedelta
-from decimal import Decimal
-from app.db import get_connection
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+import csv
+import io
+import json
+from app.db import acquire_connection, get_db, db_bound, run_db
+from app.pagination import decode_cursor, keyset_condition, set_next_cursor
+from app import holds, tasks
+from app.availability_calendar import invalidate_calendar
+from app.booking_lifecycle import lifecycle_progress
+from app.calendar import STAY_CONFLICT_COLUMNS, stay_conflict_params
+from app.host_stats import adjust, completion_delta
+from app.idempotency import IdempotencyConflict, IdempotentRequest
+from app.conditional import make_etag, is_not_modified, not_modified_response, validator_headers
 from app.Token.verify_api import verify_token
-from app.models.bookings import BookingStatus,PaymentStatus,BookingCreate,BookingResponse,BookingUpdate,BookingInDB
+from app.models.bookings import ExportFormat,BookingStatus,PaymentStatus,BookingCreate,BookingResponse,BookingUpdate,BookingInDB
 from app.models.properties import PropertyResponse, PropertyCreate, PropertyUpdate
 from app.models.users import UserCreate,UserUpdate,UserResponse,UserInDB
 
@@ -15,32 +27,233 @@ router = APIRouter(prefix="/bookings", tags=["bookings"], dependencies=[Depends(
 
 
 # Utility functions
-async def check_property_exists(conn, property_id: int):
-    cursor = conn.cursor()
+MONEY_FIELDS = ("base_price", "cleaning_fee", "service_fee", "taxes", "total_amount")
+CENT = Decimal("0.01")
+
+def to_cents(value):
+    """Round a money value to cents half up, as a DECIMAL(10,2) column stores it.
+
+    Goes through str() so a float like 2.675 rounds as written (to 2.68), not
+    as its binary approximation.
+    """
+    return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+def lock_property(conn, property_id: int, active_only: bool = True):
+    """Take the property row lock that serializes bookings for one property.
+
+    Concurrent writers for the same property queue here until the holder
+    commits; other properties are unaffected. This must be the first read of
+    the transaction: the overlap check that follows then takes its snapshot
+    after the lock is granted and sees every booking committed before it.
+    """
+    cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("SELECT 1 FROM properties WHERE property_id = %s", (property_id,))
-        return cursor.fetchone() is not None
+        query = "SELECT host_id FROM properties WHERE property_id = %s"
+        if active_only:
+            query += " AND is_active = TRUE"
+        cursor.execute(query + " FOR UPDATE", (property_id,))
+        row = cursor.fetchone()
     finally:
         cursor.close()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    return row["host_id"]
+
+def raise_if_unavailable(row):
+    if row["booked"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Property is already booked for some of the selected dates"
+        )
+    if row["blocked"]:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Property is not available for some of the selected dates"
+        )
+
+def validate_stay_dates(check_in_date: date, check_out_date: date):
+    if check_out_date <= check_in_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="check_out_date must be after check_in_date"
+        )
+
+def validate_booking_parties(conn, booking_data: BookingCreate):
+    """Lock the property, then check the guest and the requested dates.
 
-async def check_user_exists(conn, user_id: int):
-    cursor = conn.cursor()
+    Two round trips: the per-property lock, then one query for the guest,
+    overlapping bookings, blocked days and the database clock. Returns the
+    property's host_id and the clock, so the caller can stamp created_at /
+    updated_at itself and build the response without re-reading the row.
+    """
+    host_id = lock_property(conn, booking_data.property_id)
+    cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("SELECT 1 FROM users WHERE user_id = %s", (user_id,))
-        return cursor.fetchone() is not None
+        cursor.execute(f"""
+            SELECT
+                EXISTS(SELECT 1 FROM users WHERE user_id = %s) AS guest_ok,
+                {STAY_CONFLICT_COLUMNS},
+                NOW() AS db_now
+        """, [booking_data.guest_id] + stay_conflict_params(
+            booking_data.property_id, booking_data.check_in_date, booking_data.check_out_date
+        ))
+        row = cursor.fetchone()
     finally:
         cursor.close()
 
+    if not row["guest_ok"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Guest user not found"
+        )
+    if booking_data.booking_status != BookingStatus.cancelled:
+        raise_if_unavailable(row)
+    return host_id, row["db_now"]
+
+def booking_filters(property_id: Optional[int], guest_id: Optional[int], status: Optional[BookingStatus]):
+    clauses = ""
+    params = []
+    if property_id:
+        clauses += " AND property_id = %s"
+        params.append(property_id)
+    if guest_id:
+        clauses += " AND guest_id = %s"
+        params.append(guest_id)
+    if status:
+        clauses += " AND booking_status = %s"
+        params.append(status.value)
+    return clauses, params
+
+BOOKING_COLUMNS = [
+    "booking_id", "property_id", "guest_id", "check_in_date", "check_out_date",
+    "num_guests", "total_nights", "base_price", "cleaning_fee", "service_fee",
+    "taxes", "total_amount", "booking_status", "payment_status",
+    "special_requests", "cancellation_reason", "cancelled_at",
+    "created_at", "updated_at"
+]
+EXPORT_BATCH_SIZE = 1000
+
+def export_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def ndjson_chunk(rows):
+    return "".join(
+        json.dumps({k: export_value(v) for k, v in row.items()}) + "\n" for row in rows
+    )
+
+def csv_chunk(rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(BOOKING_COLUMNS)
+    for row in rows:
+        writer.writerow([export_value(row[column]) for column in BOOKING_COLUMNS])
+    return buffer.getvalue()
+
+async def stream_bookings(query: str, params: list, export_format: ExportFormat):
+    """Yield serialized bookings batch by batch from an unbuffered cursor.
+
+    The connection is taken here rather than through get_db because the body is
+    sent after the handler returns. Only EXPORT_BATCH_SIZE rows are held in
+    memory at a time, however many bookings match.
+    """
+    conn = await acquire_connection()
+    cursor = conn.cursor(dictionary=True, buffered=False)
+    finished = False
+    try:
+        await run_db(cursor.execute, query, params)
+        if export_format == ExportFormat.csv:
+            yield csv_chunk([], header=True)
+        while True:
+            rows = await run_db(cursor.fetchmany, EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            if export_format == ExportFormat.csv:
+                yield csv_chunk(rows)
+            else:
+                yield ndjson_chunk(rows)
+        finished = True
+    finally:
+        if finished:
+            cursor.close()
+            await run_db(conn.close)
+        else:
+            # Client went away mid-stream: unread rows are still pending on the
+            # socket, so drop the connection rather than draining it.
+            conn.invalidate()
+
 # Endpoints
+LIFECYCLE_TASK = "booking_lifecycle"
+
+@router.get("/lifecycle")
+async def get_lifecycle_status():
+    """Progress of the scheduled confirmed -> in_progress -> completed transitions."""
+    task = tasks.get_task(LIFECYCLE_TASK)
+    return {
+        "task": task.status() if task else None,
+        "transitions": lifecycle_progress()
+    }
+
+@router.post("/lifecycle/run", status_code=status.HTTP_202_ACCEPTED)
+async def run_lifecycle_now():
+    task = tasks.get_task(LIFECYCLE_TASK)
+    if task is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Booking lifecycle scheduler is not registered"
+        )
+    if not task.trigger():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Booking lifecycle run already in progress"
+        )
+    return {"status": "started"}
+
+@router.get("/export")
+async def export_bookings(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    property_id: Optional[int] = None,
+    guest_id: Optional[int] = None,
+    status: Optional[BookingStatus] = None
+):
+    clauses, params = booking_filters(property_id, guest_id, status)
+    query = f"""
+        SELECT {', '.join(BOOKING_COLUMNS)}
+        FROM bookings
+        WHERE 1=1 {clauses}
+        ORDER BY booking_id
+    """
+    if export_format == ExportFormat.csv:
+        media_type = "text/csv"
+        filename = "bookings.csv"
+    else:
+        media_type = "application/x-ndjson"
+        filename = "bookings.ndjson"
+    return StreamingResponse(
+        stream_bookings(query, params, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/", response_model=List[BookingResponse])
-async def get_all_bookings(
+@db_bound
+def get_all_bookings(
+    response: Response,
     property_id: Optional[int] = None,
     guest_id: Optional[int] = None,
     status: Optional[BookingStatus] = None,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    conn=Depends(get_db)
 ):
-    conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
         base_query = """
@@ -52,39 +265,55 @@ async def get_all_bookings(
             FROM bookings
             WHERE 1=1
         """
-        params = []
-        
-        if property_id:
-            base_query += " AND property_id = %s"
-            params.append(property_id)
-        if guest_id:
-            base_query += " AND guest_id = %s"
-            params.append(guest_id)
-        if status:
-            base_query += " AND booking_status = %s"
-            params.append(status.value)
+        clauses, params = booking_filters(property_id, guest_id, status)
+        base_query += clauses
             
-        base_query += " ORDER BY created_at DESC LIMIT %s OFFSET %s"
-        params.extend([limit, skip])
+        if page_cursor:
+            condition, cursor_params = keyset_condition(
+                ["created_at", "booking_id"], decode_cursor(page_cursor, datetime, int), descending=True
+            )
+            base_query += f" AND {condition} ORDER BY created_at DESC, booking_id DESC LIMIT %s"
+            params.extend(cursor_params + [limit])
+        else:
+            base_query += " ORDER BY created_at DESC, booking_id DESC LIMIT %s OFFSET %s"
+            params.extend([limit, skip])
         
         cursor.execute(base_query, params)
         bookings = cursor.fetchall()
+        set_next_cursor(response, bookings, limit, ("created_at", "booking_id"))
         return [BookingResponse(**booking) for booking in bookings]
     finally:
         cursor.close()
-        conn.close()
 
 @router.get("/{booking_id}", response_model=BookingResponse)
-async def get_booking_by_id(booking_id: int):
-    conn = get_connection()
+@db_bound
+def get_booking_by_id(
+    booking_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    conn=Depends(get_db)
+):
     cursor = conn.cursor(dictionary=True)
     try:
+        # Conditional request: check freshness with a narrow query first
+        if if_none_match is not None or if_modified_since is not None:
+            cursor.execute("""
+                SELECT updated_at, UNIX_TIMESTAMP(updated_at) AS updated_epoch
+                FROM bookings WHERE booking_id = %s
+            """, (booking_id,))
+            current = cursor.fetchone()
+            if current:
+                etag = make_etag("booking", booking_id, current['updated_at'])
+                if is_not_modified(if_none_match, if_modified_since, etag, current['updated_epoch']):
+                    return not_modified_response(etag, current['updated_epoch'])
+        
         cursor.execute("""
             SELECT booking_id, property_id, guest_id, check_in_date, check_out_date,
                    num_guests, total_nights, base_price, cleaning_fee, service_fee,
                    taxes, total_amount, booking_status, payment_status,
                    special_requests, cancellation_reason, cancelled_at,
-                   created_at, updated_at
+                   created_at, updated_at, UNIX_TIMESTAMP(updated_at) AS updated_epoch
             FROM bookings
             WHERE booking_id = %s
         """, (booking_id,))
@@ -95,40 +324,47 @@ async def get_booking_by_id(booking_id: int):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Booking not found"
             )
+        response.headers.update(validator_headers(make_etag("booking", booking_id, booking['updated_at']), booking['updated_epoch']))
         return BookingResponse(**booking)
     finally:
         cursor.close()
-        conn.close()
 
 @router.post("/", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
-async def create_booking(booking_data: BookingCreate):
-    conn = get_connection()
+@db_bound
+def create_booking(
+    booking_data: BookingCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    conn=Depends(get_db)
+):
+    idempotent = None
+    if idempotency_key:
+        idempotent = IdempotentRequest("bookings:create", idempotency_key, booking_data)
+        replayed = idempotent.replay(conn)
+        if replayed is not None:
+            return replayed
+        if idempotent.store.transactional:
+            # End the lookup's snapshot so the property lock stays the first read
+            conn.rollback()
+    
     cursor = conn.cursor(dictionary=True)
     try:
-        # Validate property and guest exist
-        if not await check_property_exists(conn, booking_data.property_id):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Property not found"
-            )
-            
-        if not await check_user_exists(conn, booking_data.guest_id):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Guest user not found"
-            )
+        validate_stay_dates(booking_data.check_in_date, booking_data.check_out_date)
+        # Lock the property, validate the guest and reject overlapping stays
+        host_id, db_now = validate_booking_parties(conn, booking_data)
         
         # Calculate total nights
         total_nights = (booking_data.check_out_date - booking_data.check_in_date).days
+        # Write and return the same cent amounts
+        money = {field: to_cents(getattr(booking_data, field)) for field in MONEY_FIELDS}
         
         cursor.execute("""
             INSERT INTO bookings (
                 property_id, guest_id, check_in_date, check_out_date,
                 num_guests, total_nights, base_price, cleaning_fee,
                 service_fee, taxes, total_amount, booking_status,
-                payment_status, special_requests
+                payment_status, special_requests, created_at, updated_at
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """, (
             booking_data.property_id,
             booking_data.guest_id,
@@ -136,24 +372,63 @@ async def create_booking(booking_data: BookingCreate):
             booking_data.check_out_date,
             booking_data.num_guests,
             total_nights,
-            booking_data.base_price,
-            booking_data.cleaning_fee,
-            booking_data.service_fee,
-            booking_data.taxes,
-            booking_data.total_amount,
+            money['base_price'],
+            money['cleaning_fee'],
+            money['service_fee'],
+            money['taxes'],
+            money['total_amount'],
             booking_data.booking_status.value,
             booking_data.payment_status.value,
-            booking_data.special_requests
+            booking_data.special_requests,
+            db_now,
+            db_now
         ))
-        conn.commit()
-        
         booking_id = cursor.lastrowid
-        cursor.execute("""
-            SELECT * FROM bookings WHERE booking_id = %s
-        """, (booking_id,))
-        new_booking = cursor.fetchone()
+        adjust(cursor, host_id, completed_bookings=completion_delta(None, booking_data.booking_status.value))
         
-        return BookingResponse(**new_booking)
+        # Build the response from what was written
+        new_booking = booking_data.dict()
+        new_booking.update(money)
+        new_booking.update(
+            booking_id=booking_id,
+            total_nights=total_nights,
+            cancellation_reason=None,
+            cancelled_at=None,
+            created_at=db_now,
+            updated_at=db_now
+        )
+        created = BookingResponse(**new_booking)
+        if idempotent:
+            # Stored in the booking's own transaction
+            idempotent.save(cursor, status.HTTP_201_CREATED, created)
+        conn.commit()
+        invalidate_calendar(booking_data.property_id)
+        if idempotent:
+            idempotent.saved()
+        if tasks.BACKGROUND_TASKS_ENABLED and holds.is_hold(
+            booking_data.booking_status.value, booking_data.payment_status.value
+        ):
+            holds.track(booking_id, db_now)
+        return created
+    except IdempotencyConflict:
+        # A concurrent retry with the same key committed first: answer with its booking
+        conn.rollback()
+        replayed = idempotent.replay(conn)
+        if replayed is not None:
+            return replayed
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is already in progress"
+        )
+    except HTTPException as exc:
+        # Release the property lock now rather than when the connection is returned
+        conn.rollback()
+        if idempotent and exc.status_code == status.HTTP_409_CONFLICT:
+            # The overlapping booking may be this request's own concurrent retry
+            replayed = idempotent.replay(conn)
+            if replayed is not None:
+                return replayed
+        raise
     except mysql.connector.Error as err:
         conn.rollback()
         raise HTTPException(
@@ -162,24 +437,54 @@ async def create_booking(booking_data: BookingCreate):
         )
     finally:
         cursor.close()
-        conn.close()
 
 @router.put("/{booking_id}", response_model=BookingResponse)
-async def update_booking(
+@db_bound
+def update_booking(
     booking_id: int,
-    booking_data: BookingUpdate
+    booking_data: BookingUpdate,
+    conn=Depends(get_db)
 ):
-    conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
-        # Check if booking exists
-        cursor.execute("SELECT booking_id FROM bookings WHERE booking_id = %s", (booking_id,))
-        if not cursor.fetchone():
+        # Check if booking exists; lock it so the status change is counted once
+        cursor.execute(f"""
+            SELECT property_id, check_in_date, check_out_date, booking_status, payment_status,
+                   ({holds.EXPIRED_HOLD_CONDITION}) AS hold_expired
+            FROM bookings
+            WHERE booking_id = %s
+            FOR UPDATE
+        """, (booking_id,))
+        existing = cursor.fetchone()
+        if not existing:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Booking not found"
             )
         
+        # Moving the dates, reviving a cancelled booking or paying for an expired
+        # hold re-checks the calendar under the same per-property lock that
+        # create_booking takes
+        check_in_date = booking_data.check_in_date or existing['check_in_date']
+        check_out_date = booking_data.check_out_date or existing['check_out_date']
+        new_status = booking_data.booking_status.value if booking_data.booking_status else existing['booking_status']
+        new_payment_status = booking_data.payment_status.value if booking_data.payment_status else existing['payment_status']
+        dates_changed = (check_in_date, check_out_date) != (existing['check_in_date'], existing['check_out_date'])
+        reactivated = existing['booking_status'] == BookingStatus.cancelled.value or (
+            existing['hold_expired'] and not holds.is_hold(new_status, new_payment_status)
+        )
+        needs_calendar_check = new_status != BookingStatus.cancelled.value and (dates_changed or reactivated)
+        host_id = None
+        if needs_calendar_check or booking_data.booking_status is not None:
+            host_id = lock_property(conn, existing['property_id'], active_only=False)
+        if needs_calendar_check:
+            validate_stay_dates(check_in_date, check_out_date)
+            cursor.execute(
+                f"SELECT {STAY_CONFLICT_COLUMNS}",
+                stay_conflict_params(existing['property_id'], check_in_date, check_out_date, booking_id)
+            )
+            raise_if_unavailable(cursor.fetchone())
+        
         # Build dynamic update query
         update_fields = []
         params = []
@@ -232,13 +537,22 @@ async def update_booking(
         params.append(booking_id)
         
         cursor.execute(query, params)
+        if booking_data.booking_status is not None:
+            adjust(cursor, host_id, completed_bookings=completion_delta(
+                existing['booking_status'], booking_data.booking_status.value
+            ))
         conn.commit()
+        invalidate_calendar(existing['property_id'])
         
         # Fetch updated booking
         cursor.execute("SELECT * FROM bookings WHERE booking_id = %s", (booking_id,))
         updated_booking = cursor.fetchone()
         
         return BookingResponse(**updated_booking)
+    except HTTPException:
+        # Release the property lock now rather than when the connection is returned
+        conn.rollback()
+        raise
     except mysql.connector.Error as err:
         conn.rollback()
         raise HTTPException(
@@ -247,23 +561,31 @@ async def update_booking(
         )
     finally:
         cursor.close()
-        conn.close()
 
 @router.delete("/{booking_id}", status_code=status.HTTP_200_OK)
-async def delete_booking(booking_id: int):
-    conn = get_connection()
-    cursor = conn.cursor()
+@db_bound
+def delete_booking(booking_id: int, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
     try:
         # Check if booking exists
-        cursor.execute("SELECT booking_id FROM bookings WHERE booking_id = %s", (booking_id,))
-        if not cursor.fetchone():
+        cursor.execute("""
+            SELECT b.booking_status, b.property_id, p.host_id
+            FROM bookings b
+            JOIN properties p ON p.property_id = b.property_id
+            WHERE b.booking_id = %s
+            FOR UPDATE OF b
+        """, (booking_id,))
+        existing = cursor.fetchone()
+        if not existing:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Booking not found"
             )
         
         cursor.execute("DELETE FROM bookings WHERE booking_id = %s", (booking_id,))
+        adjust(cursor, existing['host_id'], completed_bookings=completion_delta(existing['booking_status'], None))
         conn.commit()
+        invalidate_calendar(existing['property_id'])
         
         return {
             "status": "success",
@@ -277,5 +599,4 @@ async def delete_booking(booking_id: int):
             detail=f"Database error: {err}"
         )
     finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        cursor.close()
\ No newline at end of file
@@ -0,0 +1,219 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
+from typing import List, Optional
+from app.db import get_db, db_bound
+from app.host_stats import adjust
+from app.pagination import decode_cursor, set_next_cursor
+from app.Token.verify_api import verify_token
+from app.models.host_earnings import HostEarningCreate, HostEarningUpdate, HostEarningResponse, PayoutStatus
+import mysql.connector
+
+router = APIRouter(prefix="/host_earnings", tags=["host_earnings"], dependencies=[Depends(verify_token)],
+    responses={401: {"description": "Unauthorized"}})
+
+EARNING_COLUMNS = """
+    earning_id, host_id, booking_id, gross_amount, platform_fee, net_amount,
+    payout_status, payout_date, payout_method, created_at
+"""
+
+def validate_earning_booking(conn, host_id: int, booking_id: int):
+    """Check the booking exists and is on one of the host's listings; returns NOW()."""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT p.host_id, NOW() AS db_now
+            FROM bookings b
+            JOIN properties p ON p.property_id = b.property_id
+            WHERE b.booking_id = %s
+        """, (booking_id,))
+        booking = cursor.fetchone()
+    finally:
+        cursor.close()
+    if not booking:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Booking not found"
+        )
+    if booking['host_id'] != host_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Booking does not belong to this host"
+        )
+    return booking['db_now']
+
+def fetch_earning_for_update(cursor, earning_id: int):
+    cursor.execute(
+        f"SELECT {EARNING_COLUMNS} FROM host_earnings WHERE earning_id = %s FOR UPDATE",
+        (earning_id,)
+    )
+    earning = cursor.fetchone()
+    if not earning:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Earning not found"
+        )
+    return earning
+
+@router.get("/", response_model=List[HostEarningResponse])
+@db_bound
+def get_host_earnings(
+    response: Response,
+    host_id: Optional[int] = None,
+    payout_status: Optional[PayoutStatus] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    conn=Depends(get_db)
+):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        query = f"SELECT {EARNING_COLUMNS} FROM host_earnings"
+        filters = []
+        params = []
+        if host_id is not None:
+            filters.append("host_id = %s")
+            params.append(host_id)
+        if payout_status is not None:
+            filters.append("payout_status = %s")
+            params.append(payout_status.value)
+        if page_cursor:
+            filters.append("earning_id < %s")
+            params.append(decode_cursor(page_cursor, int)[0])
+        if filters:
+            query += " WHERE " + " AND ".join(filters)
+        query += " ORDER BY earning_id DESC LIMIT %s"
+        params.append(limit)
+        if not page_cursor:
+            query += " OFFSET %s"
+            params.append(skip)
+
+        cursor.execute(query, params)
+        earnings = cursor.fetchall()
+        set_next_cursor(response, earnings, limit, ("earning_id",))
+        return [HostEarningResponse(**earning) for earning in earnings]
+    except mysql.connector.Error as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
+
+@router.get("/{earning_id}", response_model=HostEarningResponse)
+@db_bound
+def get_host_earning(earning_id: int, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"SELECT {EARNING_COLUMNS} FROM host_earnings WHERE earning_id = %s", (earning_id,))
+        earning = cursor.fetchone()
+        if not earning:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Earning not found"
+            )
+        return HostEarningResponse(**earning)
+    finally:
+        cursor.close()
+
+@router.post("/", response_model=HostEarningResponse, status_code=status.HTTP_201_CREATED)
+@db_bound
+def create_host_earning(earning: HostEarningCreate, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        db_now = validate_earning_booking(conn, earning.host_id, earning.booking_id)
+        cursor.execute("""
+            INSERT INTO host_earnings (
+                host_id, booking_id, gross_amount, platform_fee, net_amount,
+                payout_status, payout_date, payout_method, created_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            earning.host_id,
+            earning.booking_id,
+            earning.gross_amount,
+            earning.platform_fee,
+            earning.net_amount,
+            earning.payout_status.value,
+            earning.payout_date,
+            earning.payout_method,
+            db_now
+        ))
+        earning_id = cursor.lastrowid
+        adjust(cursor, earning.host_id, net_earnings=earning.net_amount)
+        conn.commit()
+
+        return HostEarningResponse(**earning.dict(), earning_id=earning_id, created_at=db_now)
+    except HTTPException:
+        conn.rollback()
+        raise
+    except mysql.connector.Error as err:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
+
+@router.put("/{earning_id}", response_model=HostEarningResponse)
+@db_bound
+def update_host_earning(earning_id: int, earning: HostEarningUpdate, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        existing = fetch_earning_for_update(cursor, earning_id)
+        update_data = earning.dict(exclude_none=True)
+        if not update_data:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No fields to update"
+            )
+        if 'payout_status' in update_data:
+            update_data['payout_status'] = update_data['payout_status'].value
+
+        set_clause = ", ".join(f"{field} = %s" for field in update_data)
+        cursor.execute(
+            f"UPDATE host_earnings SET {set_clause} WHERE earning_id = %s",
+            list(update_data.values()) + [earning_id]
+        )
+        if 'net_amount' in update_data:
+            adjust(cursor, existing['host_id'],
+                   net_earnings=update_data['net_amount'] - existing['net_amount'])
+        conn.commit()
+
+        return HostEarningResponse(**{**existing, **update_data})
+    except HTTPException:
+        conn.rollback()
+        raise
+    except mysql.connector.Error as err:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
+
+@router.delete("/{earning_id}", status_code=status.HTTP_200_OK)
+@db_bound
+def delete_host_earning(earning_id: int, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        existing = fetch_earning_for_update(cursor, earning_id)
+        cursor.execute("DELETE FROM host_earnings WHERE earning_id = %s", (earning_id,))
+        adjust(cursor, existing['host_id'], net_earnings=-existing['net_amount'])
+        conn.commit()
+
+        return {
+            "status": "success",
+            "message": "Earning deleted successfully",
+            "earning_id": earning_id
+        }
+    except HTTPException:
+        conn.rollback()
+        raise
+    except mysql.connector.Error as err:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
 from typing import List, Optional
-from datetime import time, timedelta
+from datetime import datetime, time, timedelta
 from decimal import Decimal
-from app.db import get_connection
+from app.db import get_db, db_bound
+from app.pagination import decode_cursor, keyset_condition, set_next_cursor
 from app.Token.verify_api import verify_token
-from app.models.house_rules import HouseRuleCreate,HouseRuleUpdate,HouseRuleInDB,HouseRuleResponse
+from app.models.house_rules import HouseRuleCreate,HouseRuleUpdate,HouseRuleInDB,HouseRuleResponse,HouseRuleBulkCreate
+from app.models.bulk import BulkCreateResponse,BulkItemResult,BulkItemStatus
 from app.models.properties import PropertyResponse, PropertyCreate, PropertyUpdate
 import mysql.connector
 
@@ -22,8 +24,15 @@ def check_property_exists(conn, property_id: int):
         cursor.close()
 
 @router.get("/", response_model=List[HouseRuleResponse])
-async def get_all_house_rules(property_id: int, skip: int = 0, limit: int = 100):
-    conn = get_connection()
+@db_bound
+def get_all_house_rules(
+    property_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    conn=Depends(get_db)
+):
     cursor = conn.cursor(dictionary=True)
     try:
         # Check if property exists first
@@ -33,22 +42,31 @@ async def get_all_house_rules(property_id: int, skip: int = 0, limit: int = 100)
                 detail="Property not found"
             )
 
-        cursor.execute("""
+        query = """
             SELECT rule_id, property_id, rule_text, created_at
             FROM house_rules
             WHERE property_id = %s
-            ORDER BY created_at DESC
-            LIMIT %s OFFSET %s
-        """, (property_id, limit, skip))
+        """
+        params = [property_id]
+        if page_cursor:
+            condition, cursor_params = keyset_condition(
+                ["created_at", "rule_id"], decode_cursor(page_cursor, datetime, int), descending=True
+            )
+            query += f" AND {condition} ORDER BY created_at DESC, rule_id DESC LIMIT %s"
+            params.extend(cursor_params + [limit])
+        else:
+            query += " ORDER BY created_at DESC, rule_id DESC LIMIT %s OFFSET %s"
+            params.extend([limit, skip])
+        cursor.execute(query, params)
         rules = cursor.fetchall()
+        set_next_cursor(response, rules, limit, ("created_at", "rule_id"))
         return [HouseRuleResponse(**rule) for rule in rules]
     finally:
         cursor.close()
-        conn.close()
 
 @router.post("/", response_model=HouseRuleResponse, status_code=status.HTTP_201_CREATED)
-async def create_house_rule(rule_data: HouseRuleCreate):
-    conn = get_connection()
+@db_bound
+def create_house_rule(rule_data: HouseRuleCreate, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         # Check if property exists first
@@ -85,15 +103,58 @@ async def create_house_rule(rule_data: HouseRuleCreate):
         )
     finally:
         cursor.close()
-        conn.close()
+
+@router.post("/bulk", response_model=BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+@db_bound
+def create_house_rules_bulk(bulk_data: HouseRuleBulkCreate, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        # Check if property exists once for the whole batch
+        if not check_property_exists(conn, bulk_data.property_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Property not found"
+            )
+
+        # executemany rewrites this into a single multi-row INSERT
+        cursor.executemany("""
+            INSERT INTO house_rules 
+            (property_id, rule_text)
+            VALUES (%s, %s)
+        """, [(bulk_data.property_id, rule_text) for rule_text in bulk_data.rules])
+        # Ids need not be consecutive (auto_increment_increment, interleaved
+        # autoinc locking), so read them back. This consistent read uses the
+        # snapshot from the property check, taken before the INSERT: of the
+        # rows at or after the first id it only sees this batch, in insert order.
+        cursor.execute("""
+            SELECT rule_id FROM house_rules
+            WHERE property_id = %s AND rule_id >= %s
+            ORDER BY rule_id
+        """, (bulk_data.property_id, cursor.lastrowid))
+        rule_ids = [row['rule_id'] for row in cursor.fetchall()]
+        conn.commit()
+
+        results = [
+            BulkItemResult(index=i, status=BulkItemStatus.created, id=rule_id)
+            for i, rule_id in enumerate(rule_ids)
+        ]
+        return BulkCreateResponse.from_results(bulk_data.property_id, results)
+    except mysql.connector.Error as err:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
 
 # [Keep the existing get_house_rule_by_id, update_house_rule, and delete_house_rule endpoints]
 # They don't need property existence checks since they work with rule_id directly
 
 # Example of how to modify the PUT endpoint if you want to verify the property_id matches
 @router.put("/{rule_id}", response_model=HouseRuleResponse)
-async def update_house_rule(rule_id: int, rule_data: HouseRuleUpdate):
-    conn = get_connection()
+@db_bound
+def update_house_rule(rule_id: int, rule_data: HouseRuleUpdate, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         # First get the existing rule to verify property_id
@@ -141,11 +202,10 @@ async def update_house_rule(rule_id: int, rule_data: HouseRuleUpdate):
         )
     finally:
         cursor.close()
-        conn.close()
 
 @router.get("/{rule_id}", response_model=HouseRuleResponse)
-async def get_house_rule_by_id(rule_id: int):
-    conn = get_connection()
+@db_bound
+def get_house_rule_by_id(rule_id: int, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute("""
@@ -163,11 +223,10 @@ async def get_house_rule_by_id(rule_id: int):
         return HouseRuleResponse(**rule)
     finally:
         cursor.close()
-        conn.close()
 
 @router.delete("/{rule_id}", status_code=status.HTTP_200_OK)
-async def delete_house_rule(rule_id: int):
-    conn = get_connection()
+@db_bound
+def delete_house_rule(rule_id: int, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         # First get the rule to verify it exists and get property_id
@@ -205,5 +264,4 @@ async def delete_house_rule(rule_id: int):
             detail=f"Database error: {err}"
         )
     finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        cursor.close()
\ No newline at end of file
@@ -1,10 +1,21 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Response
 from typing import List, Optional
-from datetime import time, timedelta
+from datetime import date, time, timedelta
 from decimal import Decimal
-from app.db import get_connection
+from app.db import get_db, db_bound
+from app.pagination import decode_cursor, set_next_cursor
+from app.reference_data import get_amenities, get_categories, get_category
+from app.conditional import make_etag, is_not_modified, not_modified_response, validator_headers
+from app.calendar import AVAILABLE_FOR_STAY_FILTER, available_for_stay_params, booked_property_ids
+from app.rating_summary import summary_from_row
+from app.host_stats import adjust
+from app.listings import MAX_LISTING_IDS, attach_relations, parse_include
+from app.availability_calendar import invalidate_calendar
+from app.pricing import build_quote, build_quotes, get_rule_set, get_rule_sets, invalidate_rule_set, load_overrides
 from app.Token.verify_api import verify_token
-from app.models.properties import PropertyResponse, PropertyCreate, PropertyUpdate
+from app.models.properties import PropertyResponse, PropertyCreate, PropertyUpdate, PropertyFacetsResponse, PropertyListingResponse
+from app.models.quotes import QuoteRequest, PriceQuote, BatchQuoteRequest, BatchQuoteResponse
+from app.models.reviews import PropertyRatingSummary
 from app.models.users import UserResponse
 from app.models.property_categories import PropertyCategoryResponse
 import mysql.connector
@@ -38,91 +49,170 @@ def db_time_to_python(db_time):
     return db_time
 
 # Helper function to verify host exists
-def verify_host_exists(host_id: int):
-    conn = get_connection()
+def verify_host_exists(conn, host_id: int):
+    """Return the host's name (and the DB clock) or raise 404."""
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute("""
-            SELECT user_id FROM users 
+            SELECT first_name AS host_first_name,
+                   last_name AS host_last_name,
+                   NOW() AS db_now
+            FROM users 
             WHERE user_id = %s AND is_host = TRUE
         """, (host_id,))
-        if not cursor.fetchone():
+        host = cursor.fetchone()
+        if not host:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Host not found or not a host"
             )
+        return host
     finally:
         cursor.close()
-        conn.close()
 
 # Helper function to verify category exists
-def verify_category_exists(category_id: int):
-    conn = get_connection()
+def verify_category_exists(conn, category_id: int):
+    category = get_category(conn, category_id)
+    if not category or not category["is_active"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found or inactive"
+        )
+    return category
+
+def attach_category_names(conn, properties):
+    """Fill category_name from the reference-data cache instead of a SQL join."""
+    categories = get_categories(conn)
+    for prop in properties:
+        category = categories.get(prop['category_id'])
+        prop['category_name'] = category['category_name'] if category else None
+
+def property_validators(conn, property_id: int, row):
+    """ETag and Last-Modified for a property detail response.
+
+    The representation also carries the host's name and the category name, so
+    the host's updated_at and the (cached) category name feed the ETag too.
+    """
+    category = get_category(conn, row['category_id'])
+    etag = make_etag(
+        "property", property_id, row['updated_at'], row['host_updated_at'],
+        category['category_name'] if category else None
+    )
+    return etag, max(row['updated_epoch'], row['host_updated_epoch'])
+
+def load_listings(conn, property_ids: List[int], include):
+    """Properties in the requested order, expanded with the included relations.
+
+    One query for the properties themselves plus one per included relation,
+    however many ids are requested; unknown ids are left out.
+    """
+    property_ids = list(dict.fromkeys(property_ids))
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT category_id FROM property_categories 
-            WHERE category_id = %s AND is_active = TRUE
-        """, (category_id,))
-        if not cursor.fetchone():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found or inactive"
-            )
+        cursor.execute(f"""
+            SELECT p.*,
+                   u.first_name as host_first_name,
+                   u.last_name as host_last_name
+            FROM properties p
+            JOIN users u ON p.host_id = u.user_id
+            WHERE p.property_id IN ({", ".join(["%s"] * len(property_ids))})
+        """, property_ids)
+        found = {row['property_id']: row for row in cursor.fetchall()}
     finally:
         cursor.close()
-        conn.close()
+    listings = [found[property_id] for property_id in property_ids if property_id in found]
+    attach_category_names(conn, listings)
+    for listing in listings:
+        listing['check_in_time'] = db_time_to_python(listing.get('check_in_time'))
+        listing['check_out_time'] = db_time_to_python(listing.get('check_out_time'))
+    return attach_relations(conn, listings, include)
+
+# Natural-language relevance against the ft_properties_title_description index
+FULLTEXT_MATCH = "MATCH(p.title, p.description) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+
+def property_filters(
+    min_price: Optional[Decimal],
+    max_price: Optional[Decimal],
+    property_type: Optional[str],
+    category_id: Optional[int],
+    q: Optional[str] = None
+):
+    filters = []
+    params = []
+    if q:
+        filters.append(f"{FULLTEXT_MATCH} > 0")
+        params.append(q)
+    if min_price is not None:
+        filters.append("p.price_per_night >= %s")
+        params.append(float(min_price))
+    if max_price is not None:
+        filters.append("p.price_per_night <= %s")
+        params.append(float(max_price))
+    if property_type is not None:
+        filters.append("p.property_type = %s")
+        params.append(property_type)
+    if category_id is not None:
+        filters.append("p.category_id = %s")
+        params.append(category_id)
+    return filters, params
 
 @router.get("/", response_model=List[PropertyResponse])
-async def get_properties(
+@db_bound
+def get_properties(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     min_price: Optional[Decimal] = None,
     max_price: Optional[Decimal] = None,
     property_type: Optional[str] = None,
-    category_id: Optional[int] = None
+    category_id: Optional[int] = None,
+    q: Optional[str] = Query(None, min_length=1, max_length=255),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    conn=Depends(get_db)
 ):
-    conn = None
     cursor = None
     try:
-        conn = get_connection()
         cursor = conn.cursor(dictionary=True)
         
-        base_query = """
+        # Text search mode ranks by full-text relevance instead of property_id
+        relevance = f",\n                   {FULLTEXT_MATCH} AS relevance" if q else ""
+        base_query = f"""
             SELECT p.*, 
                    u.first_name as host_first_name,
-                   u.last_name as host_last_name,
-                   pc.category_name
+                   u.last_name as host_last_name{relevance}
             FROM properties p
             JOIN users u ON p.host_id = u.user_id
-            JOIN property_categories pc ON p.category_id = pc.category_id
             WHERE p.is_active = TRUE
         """
-        params = []
-        
         # Build filters
-        filters = []
-        if min_price is not None:
-            filters.append("p.price_per_night >= %s")
-            params.append(float(min_price))
-        if max_price is not None:
-            filters.append("p.price_per_night <= %s")
-            params.append(float(max_price))
-        if property_type is not None:
-            filters.append("p.property_type = %s")
-            params.append(property_type)
-        if category_id is not None:
-            filters.append("p.category_id = %s")
-            params.append(category_id)
+        filters, params = property_filters(min_price, max_price, property_type, category_id, q)
+        if q:
+            params.insert(0, q)
         
         if filters:
             base_query += " AND " + " AND ".join(filters)
         
-        base_query += " LIMIT %s OFFSET %s"
-        params.extend([limit, skip])
+        if q:
+            if page_cursor:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="cursor pagination is not supported with q; use skip and limit"
+                )
+            base_query += " ORDER BY relevance DESC, p.property_id LIMIT %s OFFSET %s"
+            params.extend([limit, skip])
+        elif page_cursor:
+            (last_property_id,) = decode_cursor(page_cursor, int)
+            base_query += " AND p.property_id > %s ORDER BY p.property_id LIMIT %s"
+            params.extend([last_property_id, limit])
+        else:
+            base_query += " ORDER BY p.property_id LIMIT %s OFFSET %s"
+            params.extend([limit, skip])
         
         cursor.execute(base_query, params)
         properties = cursor.fetchall()
+        if not q:
+            set_next_cursor(response, properties, limit, ("property_id",))
+        attach_category_names(conn, properties)
         
         # Convert time fields
         for prop in properties:
@@ -131,6 +221,8 @@ async def get_properties(
         
         return [PropertyResponse(**prop) for prop in properties]
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -139,22 +231,246 @@ async def get_properties(
     finally:
         if cursor:
             cursor.close()
-        if conn:
-            conn.close()
+
+# Every facet is grouped from the same filtered CTE, which MySQL materializes
+# once, so the whole facet panel costs a single statement.
+FACETS_QUERY = """
+    WITH filtered AS (
+        SELECT p.property_id, p.category_id, p.property_type, p.price_per_night
+        FROM properties p
+        WHERE {where}
+    )
+    SELECT 'total' AS facet, NULL AS value, COUNT(*) AS count FROM filtered
+    UNION ALL
+    SELECT 'category', CAST(category_id AS CHAR), COUNT(*) FROM filtered
+    GROUP BY category_id
+    UNION ALL
+    SELECT 'property_type', property_type, COUNT(*) FROM filtered
+    GROUP BY property_type
+    UNION ALL
+    SELECT 'price', CAST(bucket AS CHAR), COUNT(*)
+    FROM (SELECT FLOOR(price_per_night / %s) * %s AS bucket FROM filtered) b
+    GROUP BY bucket
+    UNION ALL
+    SELECT 'amenity', CAST(pa.amenity_id AS CHAR), COUNT(*)
+    FROM filtered f
+    JOIN property_amenities pa ON pa.property_id = f.property_id
+    GROUP BY pa.amenity_id
+"""
+
+@router.get("/facets", response_model=PropertyFacetsResponse)
+@db_bound
+def get_property_facets(
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    property_type: Optional[str] = None,
+    category_id: Optional[int] = None,
+    q: Optional[str] = Query(None, min_length=1, max_length=255),
+    price_bucket: Decimal = Query(Decimal("50"), gt=0),
+    conn=Depends(get_db)
+):
+    cursor = None
+    try:
+        cursor = conn.cursor(dictionary=True)
+        filters, params = property_filters(min_price, max_price, property_type, category_id, q)
+        where = " AND ".join(["p.is_active = TRUE"] + filters)
+        cursor.execute(
+            FACETS_QUERY.format(where=where),
+            params + [float(price_bucket), float(price_bucket)]
+        )
+        rows = cursor.fetchall()
+
+        categories = get_categories(conn)
+        amenities = get_amenities(conn)
+        facets = {"total": 0, "categories": [], "property_types": [], "price_buckets": [], "amenities": []}
+        for row in rows:
+            facet, value, count = row['facet'], row['value'], row['count']
+            if facet == 'total':
+                facets['total'] = count
+            elif facet == 'category':
+                category = categories.get(int(value))
+                facets['categories'].append({
+                    "value": value,
+                    "label": category['category_name'] if category else None,
+                    "count": count
+                })
+            elif facet == 'property_type':
+                facets['property_types'].append({"value": value, "label": value, "count": count})
+            elif facet == 'price':
+                low = Decimal(value)
+                facets['price_buckets'].append({
+                    "min_price": low, "max_price": low + price_bucket, "count": count
+                })
+            elif facet == 'amenity':
+                amenity = amenities.get(int(value))
+                facets['amenities'].append({
+                    "value": value,
+                    "label": amenity['amenity_name'] if amenity else None,
+                    "count": count
+                })
+
+        facets['categories'].sort(key=lambda f: -f['count'])
+        facets['property_types'].sort(key=lambda f: -f['count'])
+        facets['price_buckets'].sort(key=lambda f: f['min_price'])
+        facets['amenities'].sort(key=lambda f: -f['count'])
+        return facets
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching property facets: {str(e)}"
+        )
+    finally:
+        if cursor:
+            cursor.close()
+
+@router.get("/listings", response_model=List[PropertyListingResponse])
+@db_bound
+def get_property_listings(
+    ids: List[int] = Query(..., min_length=1, max_length=MAX_LISTING_IDS),
+    include: Optional[str] = Query(None, description="Comma-separated: address,photos,amenities,rules"),
+    conn=Depends(get_db)
+):
+    relations = parse_include(include)
+    return [PropertyListingResponse(**listing) for listing in load_listings(conn, ids, relations)]
+
+@router.post("/quotes", response_model=BatchQuoteResponse)
+@db_bound
+def quote_properties(request: BatchQuoteRequest, conn=Depends(get_db)):
+    """Quote one stay across many listings, e.g. a search result page.
+
+    Rule sets (cache misses only), availability overrides and overlapping
+    bookings are each loaded with one set-based query, and all totals come
+    from one pass over the (properties x nights) price matrix.
+    """
+    property_ids = list(dict.fromkeys(request.property_ids))
+    rule_sets = get_rule_sets(conn, property_ids)
+    quotable = []
+    unquoted = []
+    for property_id in property_ids:
+        rule_set = rule_sets.get(property_id)
+        if rule_set is None:
+            unquoted.append({"property_id": property_id, "detail": "Property not found"})
+        elif request.num_guests > rule_set.max_guests:
+            unquoted.append({
+                "property_id": property_id,
+                "detail": f"Property allows at most {rule_set.max_guests} guests"
+            })
+        else:
+            quotable.append(rule_set)
+
+    quotes = []
+    if quotable:
+        quotable_ids = [rs.property_id for rs in quotable]
+        overrides = load_overrides(conn, quotable_ids, request.check_in_date, request.check_out_date)
+        booked = booked_property_ids(conn, quotable_ids, request.check_in_date, request.check_out_date)
+        quotes = build_quotes(
+            quotable, request.check_in_date, request.check_out_date, overrides,
+            include_nightly=request.include_nightly, booked=booked
+        )
+    return {"quotes": quotes, "unquoted": unquoted}
+
+@router.get("/available", response_model=List[PropertyResponse])
+@db_bound
+def get_available_properties(
+    response: Response,
+    check_in: date,
+    check_out: date,
+    guests: int = Query(1, ge=1),
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    property_type: Optional[str] = None,
+    category_id: Optional[int] = None,
+    q: Optional[str] = Query(None, min_length=1, max_length=255),
+    limit: int = Query(100, ge=1, le=500),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    conn=Depends(get_db)
+):
+    """Active properties that can host `guests` from check_in to check_out.
+
+    One query: static constraints (guests, night limits, price, type,
+    category) plus NOT EXISTS anti-joins against overlapping bookings and
+    blocked days, walked in property_id order with a keyset cursor.
+    """
+    nights = (check_out - check_in).days
+    if nights <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="check_out must be after check_in"
+        )
+
+    filters, filter_params = property_filters(min_price, max_price, property_type, category_id, q)
+    filters += [
+        "p.max_guests >= %s",
+        "COALESCE(p.minimum_nights, 1) <= %s",
+        "COALESCE(p.maximum_nights, 365) >= %s",
+        "p.property_id > %s",
+        AVAILABLE_FOR_STAY_FILTER
+    ]
+    last_property_id = decode_cursor(page_cursor, int)[0] if page_cursor else 0
+    params = filter_params + [guests, nights, nights, last_property_id] + \
+        available_for_stay_params(check_in, check_out) + [limit]
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT p.*,
+                   u.first_name as host_first_name,
+                   u.last_name as host_last_name
+            FROM properties p
+            JOIN users u ON p.host_id = u.user_id
+            WHERE p.is_active = TRUE AND {' AND '.join(filters)}
+            ORDER BY p.property_id
+            LIMIT %s
+        """, params)
+        available = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    set_next_cursor(response, available, limit, ("property_id",))
+    attach_category_names(conn, available)
+    for prop in available:
+        prop['check_in_time'] = db_time_to_python(prop.get('check_in_time'))
+        prop['check_out_time'] = db_time_to_python(prop.get('check_out_time'))
+    return [PropertyResponse(**prop) for prop in available]
 
 @router.get("/{property_id}", response_model=PropertyResponse)
-async def get_property(property_id: int):
-    conn = get_connection()
+@db_bound
+def get_property(
+    property_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    conn=Depends(get_db)
+):
     cursor = conn.cursor(dictionary=True)
     try:
+        # Conditional request: check freshness with a narrow query first
+        if if_none_match is not None or if_modified_since is not None:
+            cursor.execute("""
+                SELECT p.updated_at, p.category_id, u.updated_at AS host_updated_at,
+                       UNIX_TIMESTAMP(p.updated_at) AS updated_epoch,
+                       UNIX_TIMESTAMP(u.updated_at) AS host_updated_epoch
+                FROM properties p
+                JOIN users u ON p.host_id = u.user_id
+                WHERE p.property_id = %s
+            """, (property_id,))
+            current = cursor.fetchone()
+            if current:
+                etag, last_modified = property_validators(conn, property_id, current)
+                if is_not_modified(if_none_match, if_modified_since, etag, last_modified):
+                    return not_modified_response(etag, last_modified)
+        
         cursor.execute("""
             SELECT p.*, 
                    u.first_name as host_first_name,
                    u.last_name as host_last_name,
-                   pc.category_name
+                   u.updated_at as host_updated_at,
+                   UNIX_TIMESTAMP(p.updated_at) AS updated_epoch,
+                   UNIX_TIMESTAMP(u.updated_at) AS host_updated_epoch
             FROM properties p
             JOIN users u ON p.host_id = u.user_id
-            JOIN property_categories pc ON p.category_id = pc.category_id
             WHERE p.property_id = %s
         """, (property_id,))
         property = cursor.fetchone()
@@ -163,20 +479,79 @@ async def get_property(property_id: int):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Property not found"
             )
+        attach_category_names(conn, [property])
+        response.headers.update(validator_headers(*property_validators(conn, property_id, property)))
         return PropertyResponse(**property)
     finally:
         cursor.close()
-        conn.close()
+
+@router.get("/{property_id}/listing", response_model=PropertyListingResponse)
+@db_bound
+def get_property_listing(
+    property_id: int,
+    include: Optional[str] = Query(None, description="Comma-separated: address,photos,amenities,rules"),
+    conn=Depends(get_db)
+):
+    relations = parse_include(include)
+    listings = load_listings(conn, [property_id], relations)
+    if not listings:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    return PropertyListingResponse(**listings[0])
+
+@router.post("/{property_id}/quote", response_model=PriceQuote)
+@db_bound
+def quote_property(property_id: int, request: QuoteRequest, conn=Depends(get_db)):
+    rule_set = get_rule_set(conn, property_id)
+    if rule_set is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    if request.num_guests > rule_set.max_guests:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Property allows at most {rule_set.max_guests} guests"
+        )
+    overrides = load_overrides(conn, [property_id], request.check_in_date, request.check_out_date)
+    booked = booked_property_ids(conn, [property_id], request.check_in_date, request.check_out_date)
+    return build_quote(
+        rule_set, request.check_in_date, request.check_out_date, overrides[property_id],
+        booked=property_id in booked
+    )
+
+@router.get("/{property_id}/rating", response_model=PropertyRatingSummary)
+@db_bound
+def get_property_rating(property_id: int, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        # Read from the maintained summary instead of aggregating reviews
+        cursor.execute("""
+            SELECT s.*
+            FROM properties p
+            LEFT JOIN property_rating_summary s ON s.property_id = p.property_id
+            WHERE p.property_id = %s
+        """, (property_id,))
+        row = cursor.fetchone()
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Property not found"
+            )
+        return summary_from_row(property_id, row)
+    finally:
+        cursor.close()
 
 @router.post("/", response_model=PropertyResponse, status_code=status.HTTP_201_CREATED)
-async def create_property(property: PropertyCreate):
-    verify_host_exists(property.host_id)
-    verify_category_exists(property.category_id)
+@db_bound
+def create_property(property: PropertyCreate, conn=Depends(get_db)):
+    host = verify_host_exists(conn, property.host_id)
+    category = verify_category_exists(conn, property.category_id)
     
-    conn = None
     cursor = None
     try:
-        conn = get_connection()
         cursor = conn.cursor(dictionary=True)
         
         # Check for duplicate property title for this host
@@ -196,9 +571,10 @@ async def create_property(property: PropertyCreate):
                 host_id, category_id, title, description, property_type,
                 max_guests, bedrooms, beds, bathrooms, price_per_night,
                 cleaning_fee, service_fee_percentage, minimum_nights,
-                maximum_nights, check_in_time, check_out_time, instant_book
+                maximum_nights, check_in_time, check_out_time, instant_book,
+                created_at, updated_at
             ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
             )
         """, (
             property.host_id,
@@ -217,30 +593,32 @@ async def create_property(property: PropertyCreate):
             property.maximum_nights,
             property.check_in_time.strftime('%H:%M:%S'),
             property.check_out_time.strftime('%H:%M:%S'),
-            property.instant_book
+            property.instant_book,
+            host['db_now'],
+            host['db_now']
         ))
-        conn.commit()
-        
-        # Get the newly created property
         property_id = cursor.lastrowid
-        cursor.execute("""
-            SELECT p.*, 
-                   u.first_name as host_first_name,
-                   u.last_name as host_last_name,
-                   pc.category_name
-            FROM properties p
-            JOIN users u ON p.host_id = u.user_id
-            JOIN property_categories pc ON p.category_id = pc.category_id
-            WHERE p.property_id = %s
-        """, (property_id,))
-        new_property = cursor.fetchone()
+        adjust(cursor, property.host_id, total_properties=1)
+        conn.commit()
         
-        # Convert database time formats to Python time objects
-        new_property['check_in_time'] = db_time_to_python(new_property['check_in_time'])
-        new_property['check_out_time'] = db_time_to_python(new_property['check_out_time'])
+        # Assemble the response from the input and the validation lookups
+        new_property = property.dict()
+        new_property.update(
+            property_id=property_id,
+            is_active=True,  # not written by the INSERT, so the column default applies
+            created_at=host['db_now'],
+            updated_at=host['db_now'],
+            host_first_name=host['host_first_name'],
+            host_last_name=host['host_last_name'],
+            category_name=category['category_name']
+        )
         
         return PropertyResponse(**new_property)
         
+    except HTTPException:
+        if conn:
+            conn.rollback()
+        raise
     except Exception as e:
         if conn:
             conn.rollback()
@@ -251,19 +629,25 @@ async def create_property(property: PropertyCreate):
     finally:
         if cursor:
             cursor.close()
-        if conn:
-            conn.close()
 
 @router.put("/{property_id}", response_model=PropertyResponse)
-async def update_property(property_id: int, property: PropertyUpdate):
-    conn = None
+@db_bound
+def update_property(property_id: int, property: PropertyUpdate, conn=Depends(get_db)):
     cursor = None
     try:
-        conn = get_connection()
         cursor = conn.cursor(dictionary=True)
         
-        # Check if property exists
-        cursor.execute("SELECT * FROM properties WHERE property_id = %s", (property_id,))
+        # Check if property exists (host name and DB clock come along for the response)
+        cursor.execute("""
+            SELECT p.*,
+                   u.first_name as host_first_name,
+                   u.last_name as host_last_name,
+                   NOW(6) AS db_now
+            FROM properties p
+            JOIN users u ON p.host_id = u.user_id
+            WHERE p.property_id = %s
+            FOR UPDATE OF p
+        """, (property_id,))
         existing = cursor.fetchone()
         if not existing:
             raise HTTPException(
@@ -273,9 +657,11 @@ async def update_property(property_id: int, property: PropertyUpdate):
         
         # Verify relationships if being updated
         if property.host_id is not None:
-            verify_host_exists(property.host_id)
+            host = verify_host_exists(conn, property.host_id)
+            existing['host_first_name'] = host['host_first_name']
+            existing['host_last_name'] = host['host_last_name']
         if property.category_id is not None:
-            verify_category_exists(property.category_id)
+            verify_category_exists(conn, property.category_id)
         
         # Build dynamic update query
         update_fields = []
@@ -342,30 +728,43 @@ async def update_property(property_id: int, property: PropertyUpdate):
                 detail="No fields to update"
             )
         
+        # Stamp updated_at ourselves so the response needs no re-read
+        update_fields.append("updated_at = %s")
+        params.append(existing['db_now'])
+        
         # Execute update
         query = f"UPDATE properties SET {', '.join(update_fields)} WHERE property_id = %s"
         params.append(property_id)
         cursor.execute(query, params)
+        
+        # Move the listing between hosts' active counts if ownership or status changed
+        new_host_id = property.host_id if property.host_id is not None else existing['host_id']
+        new_active = property.is_active if property.is_active is not None else bool(existing['is_active'])
+        if (new_host_id, new_active) != (existing['host_id'], bool(existing['is_active'])):
+            if existing['is_active']:
+                adjust(cursor, existing['host_id'], total_properties=-1)
+            if new_active:
+                adjust(cursor, new_host_id, total_properties=1)
         conn.commit()
+        invalidate_rule_set(property_id)
+        invalidate_calendar(property_id)
         
-        # Return updated property with joins
-        cursor.execute("""
-            SELECT p.*, 
-                   u.first_name as host_first_name,
-                   u.last_name as host_last_name,
-                   pc.category_name
-            FROM properties p
-            JOIN users u ON p.host_id = u.user_id
-            JOIN property_categories pc ON p.category_id = pc.category_id
-            WHERE p.property_id = %s
-        """, (property_id,))
-        updated = cursor.fetchone()
+        # Merge the applied changes into the row read during validation
+        updated = dict(existing)
+        updated.update(property.dict(exclude_none=True))
+        updated['updated_at'] = existing['db_now']
+        category = get_category(conn, updated['category_id'])
+        updated['category_name'] = category['category_name'] if category else None
         
         # Convert time fields
         updated['check_in_time'] = db_time_to_python(updated.get('check_in_time'))
         updated['check_out_time'] = db_time_to_python(updated.get('check_out_time'))
         
         return PropertyResponse(**updated)
+    except HTTPException:
+        if conn:
+            conn.rollback()
+        raise
     except Exception as e:
         if conn:
             conn.rollback()
@@ -376,28 +775,34 @@ async def update_property(property_id: int, property: PropertyUpdate):
     finally:
         if cursor:
             cursor.close()
-        if conn:
-            conn.close()
 
 @router.delete("/{property_id}", status_code=status.HTTP_200_OK)
-async def delete_property(property_id: int):
-    conn = get_connection()
+@db_bound
+def delete_property(property_id: int, conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
-        # Soft delete (recommended instead of actual deletion)
         cursor.execute("""
-            UPDATE properties 
-            SET is_active = FALSE 
-            WHERE property_id = %s
+            SELECT host_id FROM properties
+            WHERE property_id = %s AND is_active = TRUE
+            FOR UPDATE
         """, (property_id,))
-        
-        if cursor.rowcount == 0:
+        row = cursor.fetchone()
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Property not found"
             )
+        
+        # Soft delete (recommended instead of actual deletion)
+        cursor.execute("""
+            UPDATE properties 
+            SET is_active = FALSE 
+            WHERE property_id = %s
+        """, (property_id,))
+        adjust(cursor, row[0], total_properties=-1)
         conn.commit()
+        invalidate_rule_set(property_id)
+        invalidate_calendar(property_id)
         return {"message": "Property deactivated successfully"}
     finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        cursor.close()
\ No newline at end of file
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
 from typing import List, Optional
 from datetime import time, timedelta
 from decimal import Decimal
-from app.db import get_connection
+from app.db import get_db, db_bound
+from app.pagination import decode_cursor, set_next_cursor
+from app.geo import HAVERSINE_SQL, covering_prefixes, geohash_encode, radius_bboxes
 from app.Token.verify_api import verify_token
-from app.models.property_addresses import PropertyAddressCreate,PropertyAddressUpdate,PropertyAddressResponse,PropertyAddressInDB
+from app.models.property_addresses import PropertyAddressCreate,PropertyAddressUpdate,PropertyAddressResponse,PropertyAddressInDB,PropertyLocationResult
 from app.models.properties import PropertyResponse,PropertyInDB
 import mysql.connector
 
@@ -12,8 +14,7 @@ import mysql.connector
 router = APIRouter(prefix="/property_addreses", tags=["property_addreses"], dependencies=[Depends(verify_token)],  # Applies to all endpoints
     responses={401: {"description": "Unauthorized"}})
 
-def verify_property_exists(property_id: int):
-    conn = get_connection()
+def verify_property_exists(conn, property_id: int):
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute("SELECT property_id FROM properties WHERE property_id = %s", (property_id,))
@@ -24,26 +25,117 @@ def verify_property_exists(property_id: int):
             )
     finally:
         cursor.close()
-        conn.close()
 
 @router.get("/", response_model=List[PropertyAddressResponse])
-async def get_all_addresses(skip: int = 0, limit: int = 100):
-    conn = get_connection()
+@db_bound
+def get_all_addresses(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    conn=Depends(get_db)
+):
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT * FROM property_addresses 
-            LIMIT %s OFFSET %s
-        """, (limit, skip))
+        if page_cursor:
+            (last_address_id,) = decode_cursor(page_cursor, int)
+            cursor.execute("""
+                SELECT * FROM property_addresses 
+                WHERE address_id > %s
+                ORDER BY address_id
+                LIMIT %s
+            """, (last_address_id, limit))
+        else:
+            cursor.execute("""
+                SELECT * FROM property_addresses 
+                ORDER BY address_id
+                LIMIT %s OFFSET %s
+            """, (limit, skip))
         addresses = cursor.fetchall()
+        set_next_cursor(response, addresses, limit, ("address_id",))
         return [PropertyAddressResponse(**addr) for addr in addresses]
     finally:
         cursor.close()
-        conn.close()
+
+def address_geohash(latitude, longitude):
+    if latitude is None or longitude is None:
+        return None
+    return geohash_encode(float(latitude), float(longitude))
+
+@router.get("/search", response_model=List[PropertyLocationResult])
+@db_bound
+def search_by_location(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, le=500),
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lng: Optional[float] = Query(None, ge=-180, le=180),
+    max_lng: Optional[float] = Query(None, ge=-180, le=180),
+    limit: int = Query(100, ge=1, le=500),
+    conn=Depends(get_db)
+):
+    """Active listings inside a radius or bounding box, nearest first.
+
+    Radius searches sort by distance from (lat, lng); bounding-box searches
+    sort by distance from the box centre.
+    """
+    if lat is not None and lng is not None and radius_km is not None:
+        bboxes = radius_bboxes(lat, lng, radius_km)
+        center_lat, center_lng = lat, lng
+    elif None not in (min_lat, max_lat, min_lng, max_lng):
+        if min_lat > max_lat or min_lng > max_lng:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Bounding box minimums must not exceed maximums"
+            )
+        bboxes = [(min_lat, max_lat, min_lng, max_lng)]
+        center_lat, center_lng = (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide lat, lng and radius_km, or min_lat, max_lat, min_lng and max_lng"
+        )
+
+    # Geohash prefixes narrow the index scan to a few cells per box; the
+    # exact coordinate bounds then trim the cell edges.
+    box_filters = []
+    box_params = []
+    for bbox in bboxes:
+        prefixes = covering_prefixes(*bbox)
+        geohash_filter = " OR ".join(["pa.geohash LIKE %s"] * len(prefixes))
+        box_filters.append(f"""(({geohash_filter})
+            AND pa.latitude BETWEEN %s AND %s
+            AND pa.longitude BETWEEN %s AND %s)""")
+        box_params.extend(prefix + "%" for prefix in prefixes)
+        box_params.extend(bbox)
+    query = f"""
+        SELECT pa.address_id, pa.property_id, pa.city, pa.country, pa.neighborhood,
+               pa.latitude, pa.longitude,
+               p.title, p.property_type, p.category_id, p.price_per_night,
+               p.max_guests, p.bedrooms, p.bathrooms,
+               {HAVERSINE_SQL} AS distance_km
+        FROM property_addresses pa
+        JOIN properties p ON p.property_id = pa.property_id AND p.is_active = TRUE
+        WHERE {" OR ".join(box_filters)}
+    """
+    params = [center_lat, center_lat, center_lng] + box_params
+    if radius_km is not None and lat is not None:
+        query += " HAVING distance_km <= %s"
+        params.append(radius_km)
+    query += " ORDER BY distance_km LIMIT %s"
+    params.append(limit)
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(query, params)
+        return [PropertyLocationResult(**row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
 
 @router.get("/{address_id}", response_model=PropertyAddressResponse)
-async def get_address_by_id(address_id: int):
-    conn = get_connection()
+@db_bound
+def get_address_by_id(address_id: int, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute("""
@@ -59,20 +151,20 @@ async def get_address_by_id(address_id: int):
         return PropertyAddressResponse(**address)
     finally:
         cursor.close()
-        conn.close()
 
 @router.post("/", response_model=PropertyAddressResponse, status_code=status.HTTP_201_CREATED)
-async def create_address(address: PropertyAddressCreate):
-    verify_property_exists(address.property_id)
+@db_bound
+def create_address(address: PropertyAddressCreate, conn=Depends(get_db)):
+    verify_property_exists(conn, address.property_id)
     
-    conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute("""
             INSERT INTO property_addresses (
                 property_id, street_address, city, state_province,
-                postal_code, country, latitude, longitude, neighborhood
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                postal_code, country, latitude, longitude, neighborhood,
+                geohash
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """, (
             address.property_id,
             address.street_address,
@@ -80,9 +172,10 @@ async def create_address(address: PropertyAddressCreate):
             address.state_province,
             address.postal_code,
             address.country,
-            float(address.latitude) if address.latitude else None,
-            float(address.longitude) if address.longitude else None,
-            address.neighborhood
+            float(address.latitude) if address.latitude is not None else None,
+            float(address.longitude) if address.longitude is not None else None,
+            address.neighborhood,
+            address_geohash(address.latitude, address.longitude)
         ))
         conn.commit()
         
@@ -101,11 +194,10 @@ async def create_address(address: PropertyAddressCreate):
         )
     finally:
         cursor.close()
-        conn.close()
 
 @router.put("/{address_id}", response_model=PropertyAddressResponse)
-async def update_address(address_id: int, address: PropertyAddressUpdate):
-    conn = get_connection()
+@db_bound
+def update_address(address_id: int, address: PropertyAddressUpdate, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         # Check if address exists
@@ -145,6 +237,13 @@ async def update_address(address_id: int, address: PropertyAddressUpdate):
         if address.neighborhood is not None:
             update_fields.append("neighborhood = %s")
             params.append(address.neighborhood)
+        if address.latitude is not None or address.longitude is not None:
+            # Keep the geohash used by /search in step with the coordinates
+            update_fields.append("geohash = %s")
+            params.append(address_geohash(
+                address.latitude if address.latitude is not None else existing['latitude'],
+                address.longitude if address.longitude is not None else existing['longitude']
+            ))
         
         if not update_fields:
             raise HTTPException(
@@ -169,11 +268,10 @@ async def update_address(address_id: int, address: PropertyAddressUpdate):
         )
     finally:
         cursor.close()
-        conn.close()
 
 @router.delete("/{address_id}", status_code=status.HTTP_200_OK)
-async def delete_address(address_id: int):
-    conn = get_connection()
+@db_bound
+def delete_address(address_id: int, conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         cursor.execute("DELETE FROM property_addresses WHERE address_id = %s", (address_id,))
@@ -191,5 +289,4 @@ async def delete_address(address_id: int):
             detail=str(e)
         )
     finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        cursor.close()
\ No newline at end of file
@@ -2,18 +2,20 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List, Optional
 from datetime import time, timedelta
 from decimal import Decimal
-from app.db import get_connection
+from app.db import get_db, db_bound
+from app.reference_data import get_amenities, get_amenity
 from app.Token.verify_api import verify_token
-from app.models.property_amenities import PropertyAmenityCreate,PropertyAmenityResponse,PropertyAmenityUpdate
+from app.models.property_amenities import PropertyAmenityCreate,PropertyAmenityResponse,PropertyAmenityUpdate,PropertyAmenityBulkCreate
+from app.models.bulk import BulkCreateResponse,BulkItemResult,BulkItemStatus
 from app.models.properties import PropertyInDB,PropertyResponse
 from app.models.amenities import AmenityInDB,AmenityResponse
 import mysql.connector
+from mysql.connector import errorcode
 
 router = APIRouter(prefix="/property_amenities", tags=["property_amenities"], dependencies=[Depends(verify_token)],  # Applies to all endpoints
     responses={401: {"description": "Unauthorized"}})
 
-def verify_property_exists(property_id: int):
-    conn = get_connection()
+def verify_property_exists(conn, property_id: int):
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute("SELECT property_id FROM properties WHERE property_id = %s", (property_id,))
@@ -24,28 +26,22 @@ def verify_property_exists(property_id: int):
             )
     finally:
         cursor.close()
-        conn.close()
 
-def verify_amenity_exists(amenity_id: int):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    try:
-        cursor.execute("SELECT amenity_id FROM amenities WHERE amenity_id = %s AND is_active = TRUE", (amenity_id,))
-        if not cursor.fetchone():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Amenity not found or inactive"
-            )
-    finally:
-        cursor.close()
-        conn.close()
+def verify_amenity_exists(conn, amenity_id: int):
+    amenity = get_amenity(conn, amenity_id)
+    if not amenity or not amenity['is_active']:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Amenity not found or inactive"
+        )
+    return amenity
 
 @router.post("/", response_model=PropertyAmenityResponse, status_code=status.HTTP_201_CREATED)
-async def add_amenity_to_property(pa: PropertyAmenityCreate):
-    verify_property_exists(pa.property_id)
-    verify_amenity_exists(pa.amenity_id)
+@db_bound
+def add_amenity_to_property(pa: PropertyAmenityCreate, conn=Depends(get_db)):
+    verify_property_exists(conn, pa.property_id)
+    verify_amenity_exists(conn, pa.amenity_id)
     
-    conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
         # Check if association already exists
@@ -75,24 +71,93 @@ async def add_amenity_to_property(pa: PropertyAmenityCreate):
         )
     finally:
         cursor.close()
-        conn.close()
+
+@router.post("/bulk", response_model=BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+@db_bound
+def add_amenities_to_property_bulk(bulk_data: PropertyAmenityBulkCreate, conn=Depends(get_db)):
+    verify_property_exists(conn, bulk_data.property_id)
+
+    cursor = conn.cursor(dictionary=True)
+    try:
+        amenity_ids = list(dict.fromkeys(bulk_data.amenity_ids))
+        placeholders = ", ".join(["%s"] * len(amenity_ids))
+
+        # Validate every amenity against the reference-data cache
+        amenities = get_amenities(conn)
+        active = {a_id for a_id in amenity_ids if a_id in amenities and amenities[a_id]['is_active']}
+
+        # Find associations that already exist in one query
+        cursor.execute(f"""
+            SELECT amenity_id FROM property_amenities
+            WHERE property_id = %s AND amenity_id IN ({placeholders})
+        """, [bulk_data.property_id] + amenity_ids)
+        existing = {row['amenity_id'] for row in cursor.fetchall()}
+
+        results = []
+        to_insert = {}  # amenity_id -> its created result
+        for i, amenity_id in enumerate(bulk_data.amenity_ids):
+            if amenity_id not in active:
+                results.append(BulkItemResult(index=i, status=BulkItemStatus.failed, id=amenity_id,
+                                              detail="Amenity not found or inactive"))
+            elif amenity_id in existing or amenity_id in to_insert:
+                results.append(BulkItemResult(index=i, status=BulkItemStatus.skipped, id=amenity_id,
+                                              detail="This amenity is already associated with the property"))
+            else:
+                to_insert[amenity_id] = BulkItemResult(index=i, status=BulkItemStatus.created, id=amenity_id)
+                results.append(to_insert[amenity_id])
+
+        while to_insert:
+            try:
+                # executemany rewrites this into a single multi-row INSERT
+                cursor.executemany("""
+                    INSERT INTO property_amenities (property_id, amenity_id)
+                    VALUES (%s, %s)
+                """, [(bulk_data.property_id, amenity_id) for amenity_id in to_insert])
+                break
+            except mysql.connector.IntegrityError as err:
+                if err.errno != errorcode.ER_DUP_ENTRY:
+                    raise
+            # A concurrent request committed some of these after the check above.
+            # Only the failed statement was rolled back: find the racing rows
+            # with a locking (latest-committed) read, skip them and retry the rest.
+            cursor.execute(f"""
+                SELECT amenity_id FROM property_amenities
+                WHERE property_id = %s AND amenity_id IN ({", ".join(["%s"] * len(to_insert))})
+                FOR SHARE
+            """, [bulk_data.property_id] + list(to_insert))
+            for row in cursor.fetchall():
+                raced = to_insert.pop(row['amenity_id'])
+                raced.status = BulkItemStatus.skipped
+                raced.detail = "This amenity is already associated with the property"
+        if to_insert:
+            conn.commit()
+
+        return BulkCreateResponse.from_results(bulk_data.property_id, results)
+    except mysql.connector.Error as err:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
 
 @router.put("/", response_model=PropertyAmenityResponse)
-async def update_property_amenity(
+@db_bound
+def update_property_amenity(
     property_id: int,
-    update_data: PropertyAmenityUpdate
+    update_data: PropertyAmenityUpdate,
+    conn=Depends(get_db)
 ):
-    conn = None
     cursor = None
     try:
         # Verify property exists
-        verify_property_exists(property_id)
+        verify_property_exists(conn, property_id)
         
         # Verify both old and new amenities exist
-        verify_amenity_exists(update_data.old_amenity_id)
-        verify_amenity_exists(update_data.new_amenity_id)
+        verify_amenity_exists(conn, update_data.old_amenity_id)
+        verify_amenity_exists(conn, update_data.new_amenity_id)
         
-        conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
         # Check if the old association exists
@@ -161,14 +226,12 @@ async def update_property_amenity(
     finally:
         if cursor:
             cursor.close()
-        if conn:
-            conn.close()
 
 @router.get("/property/{property_id}", response_model=List[PropertyAmenityResponse])
-async def get_property_amenities(property_id: int):
-    verify_property_exists(property_id)
+@db_bound
+def get_property_amenities(property_id: int, conn=Depends(get_db)):
+    verify_property_exists(conn, property_id)
     
-    conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute("""
@@ -181,14 +244,13 @@ async def get_property_amenities(property_id: int):
         return amenities
     finally:
         cursor.close()
-        conn.close()
 
 @router.delete("/", status_code=status.HTTP_200_OK)
-async def remove_amenity_from_property(property_id: int, amenity_id: int):
-    verify_property_exists(property_id)
-    verify_amenity_exists(amenity_id)
+@db_bound
+def remove_amenity_from_property(property_id: int, amenity_id: int, conn=Depends(get_db)):
+    verify_property_exists(conn, property_id)
+    verify_amenity_exists(conn, amenity_id)
     
-    conn = get_connection()
     cursor = conn.cursor()
     try:
         cursor.execute("""
@@ -210,5 +272,4 @@ async def remove_amenity_from_property(property_id: int, amenity_id: int):
             detail=f"Error removing amenity from property: {str(e)}"
         )
     finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        cursor.close()
\ No newline at end of file
@@ -0,0 +1,273 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List, Optional
+from datetime import date, timedelta
+from app.availability_calendar import get_calendar, invalidate_calendar
+from app.db import get_db, db_bound
+from app.Token.verify_api import verify_token
+from app.models.property_availability import PropertyAvailabilityCreate, PropertyAvailabilityResponse, PropertyCalendarResponse, AvailabilityRangeAction, AvailabilityRangeUpdate, AvailabilityRangeResponse
+import mysql.connector
+
+router = APIRouter(prefix="/property_availability", tags=["Property_availability"], dependencies=[Depends(verify_token)],  # Applies to all endpoints
+    responses={401: {"description": "Unauthorized"}})
+
+AVAILABILITY_COLUMNS = """
+    availability_id, property_id, available_date, is_available,
+    price_override, minimum_nights_override, notes
+"""
+
+# Rows per multi-row INSERT; 500 properties x 366 days is ~180 statements
+RANGE_CHUNK_ROWS = 1000
+
+RANGE_UPSERT_UPDATES = {
+    AvailabilityRangeAction.block: "is_available = VALUES(is_available)",
+    AvailabilityRangeAction.set_price: "price_override = VALUES(price_override)",
+}
+
+
+def add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    return date(day.year + month_index // 12, month_index % 12 + 1, 1)
+
+
+@router.get("/property/{property_id}/calendar", response_model=PropertyCalendarResponse)
+@db_bound
+def get_property_calendar(
+    property_id: int,
+    start_date: Optional[date] = None,
+    months: int = Query(12, ge=1, le=24),
+    conn=Depends(get_db)
+):
+    """Availability, nightly price and minimum stay as runs of identical days.
+
+    The window starts at start_date (default today) and ends on the last day
+    of the `months`-th calendar month.
+    """
+    start = start_date or date.today()
+    end = add_months(start.replace(day=1), months) - timedelta(days=1)
+    runs = get_calendar(conn, property_id, start, end)
+    if runs is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    return PropertyCalendarResponse(property_id=property_id, start_date=start, end_date=end, runs=runs)
+
+
+@router.get("/", response_model=List[PropertyAvailabilityResponse])
+@db_bound
+def get_property_availability(
+    property_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(366, ge=1, le=1000),
+    conn=Depends(get_db)
+):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        query = f"SELECT {AVAILABILITY_COLUMNS} FROM property_availability WHERE property_id = %s"
+        params = [property_id]
+        if start_date:
+            query += " AND available_date >= %s"
+            params.append(start_date)
+        if end_date:
+            query += " AND available_date <= %s"
+            params.append(end_date)
+        query += " ORDER BY available_date LIMIT %s"
+        params.append(limit)
+        cursor.execute(query, params)
+        return [PropertyAvailabilityResponse(**row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+@router.post("/", response_model=PropertyAvailabilityResponse)
+@db_bound
+def upsert_property_availability(availability: PropertyAvailabilityCreate, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT 1 FROM properties WHERE property_id = %s", (availability.property_id,))
+        if not cursor.fetchone():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Property not found"
+            )
+
+        cursor.execute("""
+            INSERT INTO property_availability
+            (property_id, available_date, is_available, price_override, minimum_nights_override, notes)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                is_available = VALUES(is_available),
+                price_override = VALUES(price_override),
+                minimum_nights_override = VALUES(minimum_nights_override),
+                notes = VALUES(notes)
+        """, (
+            availability.property_id,
+            availability.available_date,
+            availability.is_available,
+            availability.price_override,
+            availability.minimum_nights_override,
+            availability.notes
+        ))
+        cursor.execute(f"""
+            SELECT {AVAILABILITY_COLUMNS} FROM property_availability
+            WHERE property_id = %s AND available_date = %s
+        """, (availability.property_id, availability.available_date))
+        row = cursor.fetchone()
+        conn.commit()
+        invalidate_calendar(availability.property_id)
+        return PropertyAvailabilityResponse(**row)
+    except mysql.connector.Error as err:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
+
+
+def range_chunks(property_ids, days, size=RANGE_CHUNK_ROWS):
+    """(property_id, date) pairs in index order, `size` at a time."""
+    chunk = []
+    for property_id in property_ids:
+        for day in days:
+            chunk.append((property_id, day))
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def upsert_range(cursor, update: AvailabilityRangeUpdate, property_ids, days):
+    """One multi-row INSERT ... ON DUPLICATE KEY UPDATE per chunk.
+
+    Only the column the action owns is overwritten on existing rows, so a
+    block keeps a date's price override and vice versa.
+    """
+    is_available = update.action != AvailabilityRangeAction.block
+    assignments = RANGE_UPSERT_UPDATES[update.action] + ", notes = COALESCE(VALUES(notes), notes)"
+    for chunk in range_chunks(property_ids, days):
+        params = []
+        for property_id, day in chunk:
+            params.extend([property_id, day, is_available, update.price_override, update.notes])
+        cursor.execute(f"""
+            INSERT INTO property_availability
+            (property_id, available_date, is_available, price_override, notes)
+            VALUES {", ".join(["(%s, %s, %s, %s, %s)"] * len(chunk))}
+            ON DUPLICATE KEY UPDATE {assignments}
+        """, params)
+
+
+def reset_range(cursor, update: AvailabilityRangeUpdate, property_ids):
+    """Undo a block or price override over the range, then drop rows left empty.
+
+    Unblocking never needs new rows (no row already means available), so this
+    is a ranged UPDATE on unique_property_date rather than an upsert.
+    """
+    id_placeholders = ", ".join(["%s"] * len(property_ids))
+    range_params = property_ids + [update.start_date, update.end_date]
+    assignment = "is_available = TRUE" if update.action == AvailabilityRangeAction.unblock else "price_override = NULL"
+    if update.notes is not None:
+        assignment += ", notes = %s"
+    cursor.execute(f"""
+        UPDATE property_availability SET {assignment}
+        WHERE property_id IN ({id_placeholders}) AND available_date BETWEEN %s AND %s
+    """, ([update.notes] if update.notes is not None else []) + range_params)
+    cursor.execute(f"""
+        DELETE FROM property_availability
+        WHERE property_id IN ({id_placeholders}) AND available_date BETWEEN %s AND %s
+          AND is_available AND price_override IS NULL
+          AND minimum_nights_override IS NULL AND notes IS NULL
+    """, range_params)
+
+
+@router.post("/range", response_model=AvailabilityRangeResponse)
+@db_bound
+def update_availability_range(update: AvailabilityRangeUpdate, conn=Depends(get_db)):
+    """Block, unblock or override the price of every date in [start_date, end_date]
+    for many properties at once, in a single transaction.
+    """
+    # Sorted so concurrent range writes take index locks in the same order
+    property_ids = sorted(set(update.property_ids))
+    days = [update.start_date + timedelta(days=n) for n in range((update.end_date - update.start_date).days + 1)]
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT property_id FROM properties
+            WHERE property_id IN ({", ".join(["%s"] * len(property_ids))})
+        """, property_ids)
+        missing = set(property_ids) - {row['property_id'] for row in cursor.fetchall()}
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Properties not found: {sorted(missing)}"
+            )
+
+        if update.action == AvailabilityRangeAction.block or update.price_override is not None:
+            upsert_range(cursor, update, property_ids, days)
+        else:
+            reset_range(cursor, update, property_ids)
+        conn.commit()
+        for property_id in property_ids:
+            invalidate_calendar(property_id)
+        return AvailabilityRangeResponse(
+            action=update.action,
+            property_ids=property_ids,
+            start_date=update.start_date,
+            end_date=update.end_date,
+            days=len(days),
+            property_dates=len(property_ids) * len(days)
+        )
+    except mysql.connector.Error as err:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
+
+
+@router.get("/{availability_id}", response_model=PropertyAvailabilityResponse)
+@db_bound
+def get_availability_by_id(availability_id: int, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"SELECT {AVAILABILITY_COLUMNS} FROM property_availability WHERE availability_id = %s", (availability_id,))
+        row = cursor.fetchone()
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Availability entry not found"
+            )
+        return PropertyAvailabilityResponse(**row)
+    finally:
+        cursor.close()
+
+
+@router.delete("/{availability_id}", status_code=status.HTTP_204_NO_CONTENT)
+@db_bound
+def delete_availability(availability_id: int, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT property_id FROM property_availability WHERE availability_id = %s", (availability_id,))
+        row = cursor.fetchone()
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Availability entry not found"
+            )
+        cursor.execute("DELETE FROM property_availability WHERE availability_id = %s", (availability_id,))
+        conn.commit()
+        invalidate_calendar(row['property_id'])
+        return None
+    except mysql.connector.Error as err:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
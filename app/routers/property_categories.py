@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Header
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Response
 from typing import Optional
-from app.db import get_connection
+from app.db import get_db, db_bound
+from app.pagination import decode_cursor, set_next_cursor
+from app.reference_data import invalidate_categories
 from app.models.property_categories import PropertyCategoryCreate,PropertyCategoryInDB,PropertyCategoryUpdate,PropertyCategoryResponse
 from app.Token.verify_api import verify_token
 from datetime import datetime
@@ -15,23 +17,39 @@ router = APIRouter(prefix="/property_categories", tags=["property_categories"],
 
 
 @router.get("/", response_model=List[PropertyCategoryResponse])
-async def get_all_categories(skip: int = 0, limit: int = 100):
-    conn = get_connection()
+@db_bound
+def get_all_categories(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    conn=Depends(get_db)
+):
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT * FROM property_categories 
-            LIMIT %s OFFSET %s
-        """, (limit, skip))
+        if page_cursor:
+            (last_category_id,) = decode_cursor(page_cursor, int)
+            cursor.execute("""
+                SELECT * FROM property_categories 
+                WHERE category_id > %s
+                ORDER BY category_id
+                LIMIT %s
+            """, (last_category_id, limit))
+        else:
+            cursor.execute("""
+                SELECT * FROM property_categories 
+                ORDER BY category_id
+                LIMIT %s OFFSET %s
+            """, (limit, skip))
         categories = cursor.fetchall()
+        set_next_cursor(response, categories, limit, ("category_id",))
         return [PropertyCategoryResponse(**cat) for cat in categories]
     finally:
         cursor.close()
-        conn.close()
 
 @router.get("/{category_id}", response_model=PropertyCategoryResponse)
-async def get_category_by_id(category_id: int):
-    conn = get_connection()
+@db_bound
+def get_category_by_id(category_id: int, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute("""
@@ -47,11 +65,10 @@ async def get_category_by_id(category_id: int):
         return PropertyCategoryResponse(**category)
     finally:
         cursor.close()
-        conn.close()
 
 @router.post("/", response_model=PropertyCategoryResponse, status_code=status.HTTP_201_CREATED)
-async def create_category(category: PropertyCategoryCreate):
-    conn = get_connection()
+@db_bound
+def create_category(category: PropertyCategoryCreate, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         # Check if category name already exists
@@ -77,6 +94,7 @@ async def create_category(category: PropertyCategoryCreate):
             category.is_active
         ))
         conn.commit()
+        invalidate_categories()
         
         # Get the newly created category
         category_id = cursor.lastrowid
@@ -88,11 +106,10 @@ async def create_category(category: PropertyCategoryCreate):
         return PropertyCategoryResponse(**new_category)
     finally:
         cursor.close()
-        conn.close()
 
 @router.put("/{category_id}", response_model=PropertyCategoryResponse)
-async def update_category(category_id: int, category: PropertyCategoryUpdate):
-    conn = get_connection()
+@db_bound
+def update_category(category_id: int, category: PropertyCategoryUpdate, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         # Check if category exists
@@ -151,6 +168,7 @@ async def update_category(category_id: int, category: PropertyCategoryUpdate):
         values.append(category_id)
         cursor.execute(query, values)
         conn.commit()
+        invalidate_categories()
         
         # Return updated category
         cursor.execute("""
@@ -161,11 +179,10 @@ async def update_category(category_id: int, category: PropertyCategoryUpdate):
         return PropertyCategoryResponse(**updated)
     finally:
         cursor.close()
-        conn.close()
 
 @router.delete("/{category_id}", status_code=status.HTTP_200_OK)
-async def delete_category(category_id: int):
-    conn = get_connection()
+@db_bound
+def delete_category(category_id: int, conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         cursor.execute("""
@@ -178,7 +195,7 @@ async def delete_category(category_id: int):
                 detail="Category not found"
             )
         conn.commit()
+        invalidate_categories()
         return {"message": "Category deleted successfully"}
     finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        cursor.close()
\ No newline at end of file
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
 from typing import List, Optional
 from datetime import time, timedelta
 from decimal import Decimal
-from app.db import get_connection
+from app.db import get_db, db_bound
+from app.pagination import decode_cursor, keyset_condition, set_next_cursor
 from app.Token.verify_api import verify_token
-from app.models.property_photos import PropertyPhotoCreate,PropertyPhotoUpdate,PropertyPhotoInDB,PropertyPhotoResponse
+from app.models.property_photos import PropertyPhotoCreate,PropertyPhotoUpdate,PropertyPhotoInDB,PropertyPhotoResponse,PropertyPhotoBulkCreate
+from app.models.bulk import BulkCreateResponse,BulkItemResult,BulkItemStatus
 from app.models.properties import PropertyResponse, PropertyCreate, PropertyUpdate
 import mysql.connector
 
@@ -12,25 +14,49 @@ router = APIRouter(prefix="/property_photos", tags=["property_photos"], dependen
     responses={401: {"description": "Unauthorized"}})
 
 @router.get("/", response_model=List[PropertyPhotoResponse])
-async def get_all_property_photos(skip: int = 0, limit: int = 100):
-    conn = get_connection()
+@db_bound
+def get_all_property_photos(
+    response: Response,
+    property_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    conn=Depends(get_db)
+):
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
+        query = """
             SELECT photo_id, property_id, photo_url, caption, 
                    is_cover_photo, display_order, uploaded_at
             FROM property_photos
-            ORDER BY display_order
-            LIMIT %s OFFSET %s
-        """, (limit, skip))
+        """
+        filters = []
+        params = []
+        if property_id is not None:
+            filters.append("property_id = %s")
+            params.append(property_id)
+        if page_cursor:
+            condition, cursor_params = keyset_condition(
+                ["display_order", "photo_id"], decode_cursor(page_cursor, int, int)
+            )
+            filters.append(condition)
+            params.extend(cursor_params)
+        if filters:
+            query += " WHERE " + " AND ".join(filters)
+        query += " ORDER BY display_order, photo_id LIMIT %s"
+        params.append(limit)
+        if not page_cursor:
+            query += " OFFSET %s"
+            params.append(skip)
+        cursor.execute(query, params)
         photos = cursor.fetchall()
+        set_next_cursor(response, photos, limit, ("display_order", "photo_id"))
         return [PropertyPhotoResponse(**photo) for photo in photos]
     finally:
         cursor.close()
-        conn.close()
 @router.get("/{photo_id}", response_model=PropertyPhotoResponse)
-async def get_property_photo_by_id(photo_id: int):
-    conn = get_connection()
+@db_bound
+def get_property_photo_by_id(photo_id: int, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute("""
@@ -49,11 +75,10 @@ async def get_property_photo_by_id(photo_id: int):
         return PropertyPhotoResponse(**photo)
     finally:
         cursor.close()
-        conn.close()
 
 @router.post("/", response_model=PropertyPhotoResponse, status_code=status.HTTP_201_CREATED)
-async def create_property_photo(photo_data: PropertyPhotoCreate):
-    conn = get_connection()
+@db_bound
+def create_property_photo(photo_data: PropertyPhotoCreate, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute("""
@@ -88,11 +113,69 @@ async def create_property_photo(photo_data: PropertyPhotoCreate):
         )
     finally:
         cursor.close()
-        conn.close()
+
+@router.post("/bulk", response_model=BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+@db_bound
+def create_property_photos_bulk(bulk_data: PropertyPhotoBulkCreate, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        # Validate the parent property once for the whole batch
+        cursor.execute("""
+            SELECT EXISTS(SELECT 1 FROM properties WHERE property_id = %s) AS property_ok,
+                   NOW() AS db_now
+        """, (bulk_data.property_id,))
+        check = cursor.fetchone()
+        if not check['property_ok']:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Property not found"
+            )
+
+        # executemany rewrites this into a single multi-row INSERT
+        cursor.executemany("""
+            INSERT INTO property_photos 
+            (property_id, photo_url, caption, is_cover_photo, display_order, uploaded_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, [
+            (
+                bulk_data.property_id,
+                photo.photo_url,
+                photo.caption,
+                photo.is_cover_photo,
+                photo.display_order,
+                check['db_now']
+            )
+            for photo in bulk_data.photos
+        ])
+        # Ids need not be consecutive (auto_increment_increment, interleaved
+        # autoinc locking), so read them back. This consistent read uses the
+        # snapshot from the property check, taken before the INSERT: of the
+        # rows at or after the first id it only sees this batch, in insert order.
+        cursor.execute("""
+            SELECT photo_id FROM property_photos
+            WHERE property_id = %s AND photo_id >= %s
+            ORDER BY photo_id
+        """, (bulk_data.property_id, cursor.lastrowid))
+        photo_ids = [row['photo_id'] for row in cursor.fetchall()]
+        conn.commit()
+
+        results = [
+            BulkItemResult(index=i, status=BulkItemStatus.created, id=photo_id)
+            for i, photo_id in enumerate(photo_ids)
+        ]
+        return BulkCreateResponse.from_results(bulk_data.property_id, results)
+    except mysql.connector.Error as err:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
 
 @router.put("/{photo_id}", response_model=PropertyPhotoResponse)
-async def update_property_photo(photo_id: int, photo_data: PropertyPhotoUpdate):
-    conn = get_connection()
+@db_bound
+def update_property_photo(photo_id: int, photo_data: PropertyPhotoUpdate, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         # First check if photo exists
@@ -150,11 +233,10 @@ async def update_property_photo(photo_id: int, photo_data: PropertyPhotoUpdate):
         )
     finally:
         cursor.close()
-        conn.close()
 
 @router.delete("/{photo_id}", status_code=status.HTTP_200_OK)
-async def delete_property_photo(photo_id: int):
-    conn = get_connection()
+@db_bound
+def delete_property_photo(photo_id: int, conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         # First check if photo exists
@@ -176,5 +258,4 @@ async def delete_property_photo(photo_id: int):
             detail=f"Database error: {err}"
         )
     finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        cursor.close()
\ No newline at end of file
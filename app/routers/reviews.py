@@ -0,0 +1,286 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
+from datetime import datetime
+from typing import List, Optional
+from app.db import get_db, db_bound
+from app.host_stats import adjust
+from app.pagination import decode_cursor, keyset_condition, set_next_cursor
+from app.rating_summary import apply_review
+from app.Token.verify_api import verify_token
+from app.models.reviews import ReviewCreate, ReviewUpdate, ReviewResponse, ReviewType
+import mysql.connector
+from mysql.connector import errorcode
+
+router = APIRouter(prefix="/reviews", tags=["reviews"], dependencies=[Depends(verify_token)],
+    responses={401: {"description": "Unauthorized"}})
+
+REVIEW_COLUMNS = """
+    r.review_id, r.booking_id, r.reviewer_id, r.reviewee_id, r.review_type, r.rating,
+    r.review_text, r.cleanliness_rating, r.communication_rating, r.check_in_rating,
+    r.accuracy_rating, r.location_rating, r.value_rating, r.is_public, r.created_at
+"""
+
+def validate_review_booking(conn, review: ReviewCreate):
+    """Check the booking can take this review and return its property_id and NOW().
+
+    The reviewer and reviewee must be the booking's guest and host in the
+    direction given by review_type, the stay must be completed, and each
+    booking takes at most one review per direction.
+
+    The booking row is locked first so concurrent reviews of the same booking
+    run the duplicate check one after another; the check itself is a locking
+    read so it sees reviews committed after this transaction's snapshot.
+    uq_reviews_booking_type backs it up in the schema.
+    """
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT b.property_id, b.guest_id, b.booking_status, p.host_id, NOW() AS db_now
+            FROM bookings b
+            JOIN properties p ON p.property_id = b.property_id
+            WHERE b.booking_id = %s
+            FOR UPDATE OF b
+        """, (review.booking_id,))
+        booking = cursor.fetchone()
+        if booking:
+            cursor.execute("""
+                SELECT 1 FROM reviews
+                WHERE booking_id = %s AND review_type = %s
+                FOR SHARE
+            """, (review.booking_id, review.review_type.value))
+            booking['already_reviewed'] = cursor.fetchone() is not None
+    finally:
+        cursor.close()
+
+    if not booking:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Booking not found"
+        )
+    if review.review_type == ReviewType.guest_to_host:
+        parties = (booking['guest_id'], booking['host_id'])
+    else:
+        parties = (booking['host_id'], booking['guest_id'])
+    if (review.reviewer_id, review.reviewee_id) != parties:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Reviewer and reviewee must be the booking's guest and host"
+        )
+    if booking['booking_status'] != 'completed':
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only completed bookings can be reviewed"
+        )
+    if booking['already_reviewed']:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This booking has already been reviewed"
+        )
+    return booking['property_id'], booking['db_now']
+
+def fetch_review_for_update(cursor, review_id: int):
+    """Lock a review row and return it together with its booking's property_id."""
+    cursor.execute(f"""
+        SELECT {REVIEW_COLUMNS}, b.property_id
+        FROM reviews r
+        JOIN bookings b ON b.booking_id = r.booking_id
+        WHERE r.review_id = %s
+        FOR UPDATE
+    """, (review_id,))
+    review = cursor.fetchone()
+    if not review:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Review not found"
+        )
+    return review
+
+@router.get("/", response_model=List[ReviewResponse])
+@db_bound
+def get_reviews(
+    response: Response,
+    property_id: Optional[int] = None,
+    booking_id: Optional[int] = None,
+    reviewee_id: Optional[int] = None,
+    review_type: Optional[ReviewType] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    conn=Depends(get_db)
+):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        query = f"SELECT {REVIEW_COLUMNS} FROM reviews r"
+        filters = []
+        params = []
+        if property_id is not None:
+            query += " JOIN bookings b ON b.booking_id = r.booking_id"
+            filters.append("b.property_id = %s")
+            params.append(property_id)
+        if booking_id is not None:
+            filters.append("r.booking_id = %s")
+            params.append(booking_id)
+        if reviewee_id is not None:
+            filters.append("r.reviewee_id = %s")
+            params.append(reviewee_id)
+        if review_type is not None:
+            filters.append("r.review_type = %s")
+            params.append(review_type.value)
+        if page_cursor:
+            condition, cursor_params = keyset_condition(
+                ["r.created_at", "r.review_id"], decode_cursor(page_cursor, datetime, int), descending=True
+            )
+            filters.append(condition)
+            params.extend(cursor_params)
+        if filters:
+            query += " WHERE " + " AND ".join(filters)
+        query += " ORDER BY r.created_at DESC, r.review_id DESC LIMIT %s"
+        params.append(limit)
+        if not page_cursor:
+            query += " OFFSET %s"
+            params.append(skip)
+
+        cursor.execute(query, params)
+        reviews = cursor.fetchall()
+        set_next_cursor(response, reviews, limit, ("created_at", "review_id"))
+        return [ReviewResponse(**review) for review in reviews]
+    except mysql.connector.Error as err:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
+
+@router.get("/{review_id}", response_model=ReviewResponse)
+@db_bound
+def get_review(review_id: int, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"SELECT {REVIEW_COLUMNS} FROM reviews r WHERE r.review_id = %s", (review_id,))
+        review = cursor.fetchone()
+        if not review:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Review not found"
+            )
+        return ReviewResponse(**review)
+    finally:
+        cursor.close()
+
+@router.post("/", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
+@db_bound
+def create_review(review: ReviewCreate, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        property_id, db_now = validate_review_booking(conn, review)
+        review_data = review.dict()
+        review_data['review_type'] = review.review_type.value
+
+        cursor.execute("""
+            INSERT INTO reviews (
+                booking_id, reviewer_id, reviewee_id, review_type, rating, review_text,
+                cleanliness_rating, communication_rating, check_in_rating,
+                accuracy_rating, location_rating, value_rating, is_public, created_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            review_data['booking_id'], review_data['reviewer_id'], review_data['reviewee_id'],
+            review_data['review_type'], review_data['rating'], review_data['review_text'],
+            review_data['cleanliness_rating'], review_data['communication_rating'],
+            review_data['check_in_rating'], review_data['accuracy_rating'],
+            review_data['location_rating'], review_data['value_rating'],
+            review_data['is_public'], db_now
+        ))
+        review_id = cursor.lastrowid
+        # Summary totals and host counters commit together with the review itself
+        apply_review(cursor, property_id, review_data)
+        if review.review_type == ReviewType.guest_to_host:
+            adjust(cursor, review.reviewee_id, rating_sum=review.rating, rating_count=1)
+        conn.commit()
+
+        return ReviewResponse(**review_data, review_id=review_id, created_at=db_now)
+    except HTTPException:
+        conn.rollback()
+        raise
+    except mysql.connector.Error as err:
+        conn.rollback()
+        if err.errno == errorcode.ER_DUP_ENTRY:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="This booking has already been reviewed"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
+
+@router.put("/{review_id}", response_model=ReviewResponse)
+@db_bound
+def update_review(review_id: int, review: ReviewUpdate, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        existing = fetch_review_for_update(cursor, review_id)
+        property_id = existing.pop('property_id')
+        update_data = review.dict(exclude_unset=True)
+        if 'rating' in update_data and update_data['rating'] is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="rating cannot be cleared"
+            )
+        if not update_data:
+            return ReviewResponse(**existing)
+
+        set_clause = ", ".join(f"{field} = %s" for field in update_data)
+        cursor.execute(
+            f"UPDATE reviews SET {set_clause} WHERE review_id = %s",
+            list(update_data.values()) + [review_id]
+        )
+        updated = {**existing, **update_data}
+        apply_review(cursor, property_id, existing, sign=-1)
+        apply_review(cursor, property_id, updated)
+        if existing['review_type'] == ReviewType.guest_to_host.value:
+            adjust(cursor, existing['reviewee_id'], rating_sum=updated['rating'] - existing['rating'])
+        conn.commit()
+
+        return ReviewResponse(**updated)
+    except HTTPException:
+        conn.rollback()
+        raise
+    except mysql.connector.Error as err:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
+
+@router.delete("/{review_id}", status_code=status.HTTP_200_OK)
+@db_bound
+def delete_review(review_id: int, conn=Depends(get_db)):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        existing = fetch_review_for_update(cursor, review_id)
+        cursor.execute("DELETE FROM reviews WHERE review_id = %s", (review_id,))
+        apply_review(cursor, existing['property_id'], existing, sign=-1)
+        if existing['review_type'] == ReviewType.guest_to_host.value:
+            adjust(cursor, existing['reviewee_id'], rating_sum=-existing['rating'], rating_count=-1)
+        conn.commit()
+
+        return {
+            "status": "success",
+            "message": "Review deleted successfully",
+            "review_id": review_id
+        }
+    except HTTPException:
+        conn.rollback()
+        raise
+    except mysql.connector.Error as err:
+        conn.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Database error: {err}"
+        )
+    finally:
+        cursor.close()
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Header
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Response
 from typing import Optional
-from app.db import get_connection
+from app.db import get_db, db_bound
+from app.pagination import decode_cursor, set_next_cursor
 from app.models.users import UserResponse
 from app.models.user_addresses import UserAddressCreate,UserAddressInDB,UserAddressUpdate,UserAddressResponse
 from app.Token.verify_api import verify_token
@@ -11,8 +12,7 @@ import mysql.connector
 router = APIRouter(prefix="/user_addresses", tags=["User_addresses"], dependencies=[Depends(verify_token)],  # Applies to all endpoints
     responses={401: {"description": "Unauthorized"}})
 
-def verify_user_exists(user_id: int):
-    conn = get_connection()
+def verify_user_exists(conn, user_id: int):
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute("SELECT user_id FROM users WHERE user_id = %s", (user_id,))
@@ -23,28 +23,43 @@ def verify_user_exists(user_id: int):
             )
     finally:
         cursor.close()
-        conn.close()
 
 
 @router.get("/", response_model=List[UserAddressResponse])
-async def get_all_addresses(skip: int = 0, limit: int = 100):
-    conn = get_connection()
+@db_bound
+def get_all_addresses(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    conn=Depends(get_db)
+):
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("""
-            SELECT * FROM user_addresses 
-            LIMIT %s OFFSET %s
-        """, (limit, skip))
+        if page_cursor:
+            (last_address_id,) = decode_cursor(page_cursor, int)
+            cursor.execute("""
+                SELECT * FROM user_addresses 
+                WHERE address_id > %s
+                ORDER BY address_id
+                LIMIT %s
+            """, (last_address_id, limit))
+        else:
+            cursor.execute("""
+                SELECT * FROM user_addresses 
+                ORDER BY address_id
+                LIMIT %s OFFSET %s
+            """, (limit, skip))
         addresses = cursor.fetchall()
+        set_next_cursor(response, addresses, limit, ("address_id",))
         return [UserAddressResponse(**addr) for addr in addresses]
     finally:
         cursor.close()
-        conn.close()
 
 
 @router.get("/{address_id}", response_model=UserAddressResponse)
-async def get_address_by_id(address_id: int):
-    conn = get_connection()
+@db_bound
+def get_address_by_id(address_id: int, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute("""
@@ -60,13 +75,12 @@ async def get_address_by_id(address_id: int):
         return UserAddressResponse(**address)
     finally:
         cursor.close()
-        conn.close()
 
 @router.post("/", response_model=UserAddressResponse, status_code=status.HTTP_201_CREATED)
-async def create_address(address: UserAddressCreate):
-    verify_user_exists(address.user_id)
+@db_bound
+def create_address(address: UserAddressCreate, conn=Depends(get_db)):
+    verify_user_exists(conn, address.user_id)
     
-    conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
         # If setting as primary, unset any existing primary addresses
@@ -100,11 +114,10 @@ async def create_address(address: UserAddressCreate):
         return UserAddressResponse(**new_address)
     finally:
         cursor.close()
-        conn.close()
 
 @router.put("/{address_id}", response_model=UserAddressResponse)
-async def update_address(address_id: int, address: UserAddressUpdate):
-    conn = get_connection()
+@db_bound
+def update_address(address_id: int, address: UserAddressUpdate, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     try:
         # Get existing address to check user_id
@@ -178,11 +191,10 @@ async def update_address(address_id: int, address: UserAddressUpdate):
         return UserAddressResponse(**updated)
     finally:
         cursor.close()
-        conn.close()
 
 @router.delete("/{address_id}", status_code=status.HTTP_200_OK)
-async def delete_address(address_id: int):
-    conn = get_connection()
+@db_bound
+def delete_address(address_id: int, conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         cursor.execute("""
@@ -197,5 +209,4 @@ async def delete_address(address_id: int):
         conn.commit()
         return {"message": "Address deleted successfully"}
     finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        cursor.close()
\ No newline at end of file
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Header
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Response
 from typing import Optional
-from app.db import get_connection
+from app.db import get_db, db_bound
+from app.pagination import decode_cursor, set_next_cursor
+from app.conditional import make_etag, is_not_modified, not_modified_response, validator_headers
+from app.host_stats import get_host_stats
 from app.models.users import UserCreate,UserUpdate,UserResponse,UserInDB
+from app.models.host_earnings import HostDashboardResponse
 from app.Token.verify_api import verify_token
 from datetime import datetime
 from typing import List
@@ -14,39 +18,82 @@ router = APIRouter(prefix="/users", tags=["Users"], dependencies=[Depends(verify
 
 
 @router.get("/", response_model=List[UserResponse])
-async def get_users(skip: int = 0, limit: int = 100):
-    conn = get_connection()
+@db_bound
+def get_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    conn=Depends(get_db)
+):
     cursor = conn.cursor(dictionary=True)
     
     try:
-        cursor.execute("SELECT * FROM users LIMIT %s OFFSET %s", (limit, skip))
+        if page_cursor:
+            (last_user_id,) = decode_cursor(page_cursor, int)
+            cursor.execute(
+                "SELECT * FROM users WHERE user_id > %s ORDER BY user_id LIMIT %s",
+                (last_user_id, limit)
+            )
+        else:
+            cursor.execute("SELECT * FROM users ORDER BY user_id LIMIT %s OFFSET %s", (limit, skip))
         users = cursor.fetchall()
+        set_next_cursor(response, users, limit, ("user_id",))
         return [UserResponse(**user) for user in users]
     finally:
         cursor.close()
-        conn.close()
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int):
-    conn = get_connection()
+@db_bound
+def get_user(
+    user_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    conn=Depends(get_db)
+):
     cursor = conn.cursor(dictionary=True)
     
     try:
-        cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
+        # Conditional request: check freshness with a narrow query first
+        if if_none_match is not None or if_modified_since is not None:
+            cursor.execute("""
+                SELECT updated_at, UNIX_TIMESTAMP(updated_at) AS updated_epoch
+                FROM users WHERE user_id = %s
+            """, (user_id,))
+            current = cursor.fetchone()
+            if current:
+                etag = make_etag("user", user_id, current['updated_at'])
+                if is_not_modified(if_none_match, if_modified_since, etag, current['updated_epoch']):
+                    return not_modified_response(etag, current['updated_epoch'])
+        
+        cursor.execute("SELECT *, UNIX_TIMESTAMP(updated_at) AS updated_epoch FROM users WHERE user_id = %s", (user_id,))
         user = cursor.fetchone()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
+        response.headers.update(validator_headers(make_etag("user", user_id, user['updated_at']), user['updated_epoch']))
         return UserResponse(**user)
     finally:
         cursor.close()
-        conn.close()
+
+@router.get("/{user_id}/dashboard", response_model=HostDashboardResponse)
+@db_bound
+def get_host_dashboard(user_id: int, conn=Depends(get_db)):
+    # Served from the host_stats counters rather than the host_dashboard view
+    stats = get_host_stats(conn, user_id)
+    if not stats:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Host not found or not a host"
+        )
+    return HostDashboardResponse(**stats)
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(user: UserCreate):
-    conn = get_connection()
+@db_bound
+def create_user(user: UserCreate, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     
     try:
@@ -83,12 +130,11 @@ async def create_user(user: UserCreate):
         return UserResponse(**new_user)
     finally:
         cursor.close()
-        conn.close()
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-async def update_user(user_id: int, user: UserUpdate):
-    conn = get_connection()
+@db_bound
+def update_user(user_id: int, user: UserUpdate, conn=Depends(get_db)):
     cursor = conn.cursor(dictionary=True)
     
     try:
@@ -156,11 +202,10 @@ async def update_user(user_id: int, user: UserUpdate):
         return UserResponse(**updated_user)
     finally:
         cursor.close()
-        conn.close()
 
 @router.delete("/{user_id}", status_code=status.HTTP_200_OK, response_model=dict)
-async def delete_user(user_id: int):
-    conn = get_connection()
+@db_bound
+def delete_user(user_id: int, conn=Depends(get_db)):
     cursor = conn.cursor()
     
     try:
@@ -173,5 +218,4 @@ async def delete_user(user_id: int):
         conn.commit()
         return {"message": "User deleted successfully"}
     finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        cursor.close()
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""In-process periodic background jobs.
+
+Jobs are plain blocking callables taking a pooled connection; each run
+checks a connection out, executes on the DB executor and returns it, the
+same way request handlers do. main.py starts every registered job on
+startup and cancels them on shutdown. Set BACKGROUND_TASKS=false to run
+without them, e.g. on all but one worker process.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from app.db import acquire_connection, run_db
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_TASKS_ENABLED = os.getenv("BACKGROUND_TASKS", "true").lower() in ("1", "true", "yes")
+
+
+class PeriodicTask:
+    def __init__(self, name, interval_seconds, func, initial_delay_seconds=0):
+        self.name = name
+        self.interval = interval_seconds
+        self.func = func
+        self.initial_delay = initial_delay_seconds
+        self.runs = 0
+        self.failures = 0
+        self.running = False
+        self.last_started = None
+        self.last_finished = None
+        self.last_duration_seconds = None
+        self.last_result = None
+        self.last_error = None
+        self._handle = None
+
+    async def run_once(self):
+        if self.running:
+            return
+        self.running = True
+        self.last_started = time.time()
+        started = time.perf_counter()
+        try:
+            conn = await acquire_connection()
+            try:
+                self.last_result = await run_db(self.func, conn)
+            finally:
+                await run_db(conn.close)
+            self.last_error = None
+        except Exception as err:  # keep the loop alive; surface the error in status()
+            self.failures += 1
+            self.last_error = str(err)
+            logger.exception("background task %s failed", self.name)
+        finally:
+            self.runs += 1
+            self.running = False
+            self.last_finished = time.time()
+            self.last_duration_seconds = round(time.perf_counter() - started, 3)
+
+    async def _loop(self):
+        await asyncio.sleep(self.initial_delay)
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def trigger(self):
+        """Start an extra run now unless one is in progress; returns whether it started."""
+        if self.running:
+            return False
+        asyncio.get_running_loop().create_task(self.run_once())
+        return True
+
+    def start(self):
+        if self._handle is None:
+            self._handle = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            try:
+                await self._handle
+            except asyncio.CancelledError:
+                pass
+            self._handle = None
+
+    def status(self):
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval,
+            "scheduled": self._handle is not None,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_started": self.last_started,
+            "last_finished": self.last_finished,
+            "last_duration_seconds": self.last_duration_seconds,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+_tasks = {}
+
+
+def register(name, interval_seconds, func, initial_delay_seconds=0):
+    """Register func(conn) to run every interval_seconds once tasks start."""
+    task = PeriodicTask(name, interval_seconds, func, initial_delay_seconds)
+    _tasks[name] = task
+    return task
+
+
+def get_task(name):
+    return _tasks.get(name)
+
+
+async def start_all():
+    if not BACKGROUND_TASKS_ENABLED:
+        return
+    for task in _tasks.values():
+        task.start()
+
+
+async def stop_all():
+    for task in _tasks.values():
+        await task.stop()
+
+
+def task_status():
+    return {"enabled": BACKGROUND_TASKS_ENABLED, "tasks": [task.status() for task in _tasks.values()]}
@@ -0,0 +1,134 @@
+"""Concurrent booking benchmark: checks for double bookings under contention.
+
+Fires many simultaneous POST /bookings/ requests at a running API, with
+deliberately overlapping stays spread over a set of properties, then checks
+that no two accepted bookings on the same property overlap. Losing requests
+should get 409. Example:
+
+    uvicorn app.main:app --workers 4 &
+    python benchmarks/booking_contention.py --base-url http://127.0.0.1:8000 \\
+        --properties 1-200 --guest-id 1 --concurrency 300 --requests 5000
+
+Use a scratch database: the bookings it creates are left in place. Only the
+standard library is used.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+
+def parse_range(value):
+    first, _, last = value.partition("-")
+    return list(range(int(first), int(last or first) + 1))
+
+
+def build_plan(total, property_ids, guest_id, start, window_days, max_nights, seed):
+    rng = random.Random(seed)
+    plan = []
+    for _ in range(total):
+        check_in = start + timedelta(days=rng.randrange(window_days))
+        nights = rng.randint(1, max_nights)
+        plan.append({
+            "property_id": rng.choice(property_ids),
+            "guest_id": guest_id,
+            "check_in_date": check_in.isoformat(),
+            "check_out_date": (check_in + timedelta(days=nights)).isoformat(),
+            "num_guests": 1,
+            "total_nights": nights,
+            "base_price": 100.0 * nights,
+            "service_fee": 3.0 * nights,
+            "total_amount": 103.0 * nights,
+        })
+    return plan
+
+
+def post(base_url, body, token, timeout):
+    request = urllib.request.Request(
+        base_url + "/bookings/",
+        data=json.dumps(body).encode(),
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+        method="POST",
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            payload = json.loads(response.read())
+            status = response.status
+    except urllib.error.HTTPError as err:
+        payload = None
+        status = err.code
+    except (urllib.error.URLError, TimeoutError):
+        payload = None
+        status = 0
+    return time.perf_counter() - started, status, payload
+
+
+def find_overlaps(accepted):
+    by_property = defaultdict(list)
+    for booking in accepted:
+        by_property[booking["property_id"]].append(
+            (booking["check_in_date"], booking["check_out_date"], booking["booking_id"])
+        )
+    overlaps = []
+    for property_id, stays in by_property.items():
+        stays.sort()
+        for (_, prev_out, prev_id), (check_in, _, booking_id) in zip(stays, stays[1:]):
+            if check_in < prev_out:
+                overlaps.append((property_id, prev_id, booking_id))
+    return overlaps
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", default="1")
+    parser.add_argument("--properties", default="1-100", help="property id range, e.g. 1-200")
+    parser.add_argument("--guest-id", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date.today() + timedelta(days=400))
+    parser.add_argument("--window-days", type=int, default=60)
+    parser.add_argument("--max-nights", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    plan = build_plan(args.requests, parse_range(args.properties), args.guest_id,
+                      args.start_date, args.window_days, args.max_nights, args.seed)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda body: post(args.base_url, body, args.token, args.timeout), plan))
+    elapsed = time.perf_counter() - started
+
+    statuses = Counter(status for _, status, _ in results)
+    accepted = [payload for _, status, payload in results if status == 201]
+    latencies = sorted(r[0] * 1000 for r in results)
+    overlaps = find_overlaps(accepted)
+
+    print(f"requests={len(results)} concurrency={args.concurrency} elapsed={elapsed:.2f}s "
+          f"throughput={len(results) / elapsed:.1f} req/s")
+    print("status " + " ".join(f"{code}={count}" for code, count in sorted(statuses.items())))
+    print(f"mean={statistics.mean(latencies):.1f}ms p50={percentile(latencies, 50):.1f}ms "
+          f"p95={percentile(latencies, 95):.1f}ms p99={percentile(latencies, 99):.1f}ms")
+    print(f"accepted={len(accepted)} double_bookings={len(overlaps)}")
+    for property_id, first_id, second_id in overlaps[:20]:
+        print(f"  property {property_id}: bookings {first_id} and {second_id} overlap")
+    raise SystemExit(1 if overlaps else 0)
+
+
+if __name__ == "__main__":
+    main()
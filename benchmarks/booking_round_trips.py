@@ -0,0 +1,111 @@
+"""Count database round trips made by POST /bookings/.
+
+Calls the create_booking handler directly with a recording connection, so no
+MySQL server is needed; every cursor.execute() and commit() is one round trip
+to the database. Run from the repository root:
+
+    python benchmarks/booking_round_trips.py --bookings 1000
+    python benchmarks/booking_round_trips.py --bookings 1000 --idempotency-keys
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.bookings import BookingCreate  # noqa: E402
+from app.routers.bookings import create_booking  # noqa: E402
+
+
+class RecordingCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.lastrowid = None
+        self._row = None
+
+    def execute(self, query, params=None):
+        self.conn.round_trips += 1
+        self.conn.statements.append(" ".join(query.split())[:60])
+        normalized = query.lstrip().upper()
+        if "IDEMPOTENCY_KEYS" in normalized:
+            # Key lookups always miss; saves and expired-key deletes return nothing
+            self._row = None
+        elif normalized.startswith("INSERT"):
+            self.conn.next_id += 1
+            self.lastrowid = self.conn.next_id
+            self._row = None
+        elif "FOR UPDATE" in normalized:
+            self._row = {"host_id": 1}
+        elif "NOW() AS DB_NOW" in normalized:
+            self._row = {"guest_ok": 1, "booked": 0, "blocked": 0, "db_now": datetime(2024, 1, 1, 12, 0)}
+        else:
+            self._row = {"booking_id": self.conn.next_id, "db_now": datetime(2024, 1, 1, 12, 0)}
+
+    def fetchone(self):
+        return self._row
+
+    def fetchall(self):
+        return [self._row] if self._row else []
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.round_trips = 0
+        self.next_id = 0
+        self.statements = []
+
+    def cursor(self, *args, **kwargs):
+        return RecordingCursor(self)
+
+    def commit(self):
+        self.round_trips += 1
+        self.statements.append("COMMIT")
+
+    def rollback(self):
+        self.round_trips += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=1000)
+    parser.add_argument("--idempotency-keys", action="store_true",
+                        help="send a fresh Idempotency-Key with every booking")
+    args = parser.parse_args()
+
+    handler = create_booking.__wrapped__
+    conn = RecordingConnection()
+    started = time.perf_counter()
+    for i in range(args.bookings):
+        check_in = date(2024, 1, 1) + timedelta(days=i % 300)
+        booking = BookingCreate(
+            property_id=1 + i % 50,
+            guest_id=1 + i % 200,
+            check_in_date=check_in,
+            check_out_date=check_in + timedelta(days=3),
+            num_guests=2,
+            total_nights=3,
+            base_price=300,
+            service_fee=9,
+            total_amount=309,
+        )
+        # Called without FastAPI, so every parameter with a Header() default
+        # has to be passed explicitly
+        idempotency_key = f"bench-{i}" if args.idempotency_keys else None
+        handler(booking, idempotency_key=idempotency_key, conn=conn)
+    elapsed = time.perf_counter() - started
+
+    per_booking = conn.statements[: len(conn.statements) // args.bookings]
+    print(f"bookings={args.bookings} round_trips={conn.round_trips} "
+          f"per_booking={conn.round_trips / args.bookings:.2f} "
+          f"handler_overhead={elapsed / args.bookings * 1e6:.1f}us")
+    for statement in per_booking:
+        print(f"  {statement}")
+
+
+if __name__ == "__main__":
+    main()
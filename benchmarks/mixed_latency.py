@@ -0,0 +1,90 @@
+"""Concurrent mixed-traffic latency benchmark against a running API.
+
+Fires a mix of list and detail GETs from many threads at once and prints
+latency percentiles. Run it against the same data set before and after a
+change to compare, e.g.:
+
+    uvicorn app.main:app --workers 1 &
+    python benchmarks/mixed_latency.py --base-url http://127.0.0.1:8000 --concurrency 64 --requests 5000
+
+Only the standard library is used so it can run from any environment.
+"""
+import argparse
+import random
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PATHS = [
+    ("/property/?limit=50", 4),
+    ("/property/{id}", 4),
+    ("/bookings/?limit=50", 3),
+    ("/bookings/{id}", 3),
+    ("/users/?limit=50", 2),
+    ("/users/{id}", 2),
+    ("/amenities/", 1),
+    ("/property_categories/", 1),
+]
+
+
+def build_plan(total, max_id, seed):
+    rng = random.Random(seed)
+    paths = [p for p, _ in DEFAULT_PATHS]
+    weights = [w for _, w in DEFAULT_PATHS]
+    return [
+        rng.choices(paths, weights)[0].replace("{id}", str(rng.randint(1, max_id)))
+        for _ in range(total)
+    ]
+
+
+def fetch(base_url, path, token, timeout):
+    request = urllib.request.Request(base_url + path, headers={"Authorization": f"Bearer {token}"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as err:
+        status = err.code
+    except (urllib.error.URLError, TimeoutError):
+        status = 0
+    return time.perf_counter() - started, status
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", default="1")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--max-id", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    plan = build_plan(args.requests, args.max_id, args.seed)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda p: fetch(args.base_url, p, args.token, args.timeout), plan))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(r[0] * 1000 for r in results)
+    errors = sum(1 for _, status in results if status == 0 or status >= 500)
+    print(f"requests={len(results)} concurrency={args.concurrency} elapsed={elapsed:.2f}s "
+          f"throughput={len(results) / elapsed:.1f} req/s errors={errors}")
+    print(f"mean={statistics.mean(latencies):.1f}ms p50={percentile(latencies, 50):.1f}ms "
+          f"p95={percentile(latencies, 95):.1f}ms p99={percentile(latencies, 99):.1f}ms "
+          f"max={latencies[-1]:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Check build_quotes totals against hand-computed quotes.
+
+Runs the quote engine on fixed rule sets, without a database, and exits
+non-zero if any quote's fees or totals differ from the expected amounts.
+Run from the repository root:
+
+    python benchmarks/quote_totals.py
+"""
+import os
+import sys
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.pricing import RuleSet, build_quote, build_quotes  # noqa: E402
+
+CHECK_IN = date(2024, 7, 1)
+CHECK_OUT = date(2024, 7, 4)
+
+
+def rule_set(property_id, price, cleaning_fee, service_fee_percentage, rules=()):
+    return RuleSet({
+        "property_id": property_id,
+        "price_per_night": Decimal(price),
+        "cleaning_fee": Decimal(cleaning_fee),
+        "service_fee_percentage": Decimal(service_fee_percentage),
+        "minimum_nights": 1,
+        "maximum_nights": 30,
+        "max_guests": 4,
+    }, list(rules))
+
+
+# (rule set, overrides, expected subtotal, cleaning, service fee, total)
+CASES = [
+    # 3 x 135.00 + 50.00 cleaning at 3%
+    (rule_set(1, "135.00", "50.00", "3.00"), [], "405.00", "50.00", "13.65", "468.65"),
+    # 150.50 at 3% is 4.515: rounds half up to 4.52
+    (rule_set(2, "30.00", "60.50", "3.00"), [], "90.00", "60.50", "4.52", "155.02"),
+    # +10% weekend rule on the second night, override on the third
+    (rule_set(3, "100.00", "0.00", "12.50", rules=[{
+        "start_date": date(2024, 7, 2), "end_date": date(2024, 7, 2),
+        "price_modifier_type": "percentage", "price_modifier_value": Decimal("10"),
+        "minimum_nights_override": None,
+    }]), [{
+        "available_date": date(2024, 7, 3), "is_available": True,
+        "price_override": Decimal("80.00"), "minimum_nights_override": None,
+    }], "290.00", "0.00", "36.25", "326.25"),
+]
+
+
+def main():
+    failures = 0
+    quotes = build_quotes(
+        [case[0] for case in CASES], CHECK_IN, CHECK_OUT,
+        {case[0].property_id: case[1] for case in CASES}, include_nightly=False
+    )
+    for case, quote in zip(CASES, quotes):
+        rs, overrides = case[0], case[1]
+        expected = dict(zip(("subtotal", "cleaning_fee", "service_fee", "total_amount"), map(Decimal, case[2:])))
+        single = build_quote(rs, CHECK_IN, CHECK_OUT, overrides)
+        for label, result in (("batch", quote), ("single", single)):
+            actual = {key: result[key] for key in expected}
+            if actual != expected:
+                failures += 1
+                print(f"property {rs.property_id} ({label}): expected {expected}, got {actual}")
+    # An overlapping booking keeps the price but makes the stay unbookable
+    booked = build_quote(CASES[0][0], CHECK_IN, CHECK_OUT, [], booked=True)
+    if booked["bookable"] or not booked["booked"] or booked["total_amount"] != Decimal(CASES[0][5]):
+        failures += 1
+        print(f"property {CASES[0][0].property_id} (booked): got {booked}")
+    print("ok" if not failures else f"{failures} mismatched quotes")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
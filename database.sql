@@ -435,4 +435,188 @@ WHERE u.is_host = TRUE
 GROUP BY u.user_id, u.first_name, u.last_name;
 
 ALTER TABLE property_addresses 
-ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
\ No newline at end of file
+ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+-- Indexes backing keyset (cursor) pagination on list endpoints
+CREATE INDEX idx_property_photos_display_order ON property_photos(display_order);
+CREATE INDEX idx_house_rules_property_created ON house_rules(property_id, created_at);
+
+-- Geohash of (latitude, longitude) for map search; prefix ranges on this
+-- index replace scans over idx_location
+ALTER TABLE property_addresses
+ADD COLUMN geohash CHAR(9) NULL,
+ADD INDEX idx_geohash (geohash);
+
+UPDATE property_addresses
+SET geohash = ST_GeoHash(longitude, latitude, 9)
+WHERE latitude IS NOT NULL AND longitude IS NOT NULL;
+
+-- Addresses once created with a 0 coordinate stored it as NULL but still got
+-- a geohash; clear those so prefix search and the distance check agree
+UPDATE property_addresses
+SET geohash = NULL
+WHERE latitude IS NULL OR longitude IS NULL;
+
+-- Microsecond updated_at for the ETags of GET /users/{id}, /property/{id}
+-- and /bookings/{id}, so two writes within one second get different ones
+ALTER TABLE users MODIFY updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+ALTER TABLE properties MODIFY updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+ALTER TABLE bookings MODIFY updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);
+
+-- Per-property date-overlap lookups for availability search
+CREATE INDEX idx_bookings_property_dates ON bookings(property_id, check_in_date, check_out_date);
+-- Covers the blocked-day probe of availability search without row lookups
+CREATE INDEX idx_property_availability_blocked ON property_availability(property_id, is_available, available_date);
+
+-- Full-text keyword search over listings (GET /property/?q=...)
+ALTER TABLE properties ADD FULLTEXT INDEX ft_properties_title_description (title, description);
+
+-- At most one review per booking and direction; create_review maps the
+-- duplicate-key error to 409. Remove any existing duplicates before adding.
+ALTER TABLE reviews ADD UNIQUE KEY uq_reviews_booking_type (booking_id, review_type);
+
+-- Running rating totals per property (guest_to_host reviews), kept in step
+-- with review writes; rebuild with `python -m app.rating_summary`
+CREATE TABLE property_rating_summary (
+    property_id INT PRIMARY KEY,
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    cleanliness_sum INT NOT NULL DEFAULT 0,
+    cleanliness_count INT NOT NULL DEFAULT 0,
+    communication_sum INT NOT NULL DEFAULT 0,
+    communication_count INT NOT NULL DEFAULT 0,
+    check_in_sum INT NOT NULL DEFAULT 0,
+    check_in_count INT NOT NULL DEFAULT 0,
+    accuracy_sum INT NOT NULL DEFAULT 0,
+    accuracy_count INT NOT NULL DEFAULT 0,
+    location_sum INT NOT NULL DEFAULT 0,
+    location_count INT NOT NULL DEFAULT 0,
+    value_sum INT NOT NULL DEFAULT 0,
+    value_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (property_id) REFERENCES properties(property_id) ON DELETE CASCADE
+);
+
+INSERT INTO property_rating_summary (
+    property_id, review_count, rating_sum,
+    cleanliness_sum, cleanliness_count, communication_sum, communication_count,
+    check_in_sum, check_in_count, accuracy_sum, accuracy_count,
+    location_sum, location_count, value_sum, value_count
+)
+SELECT b.property_id, COUNT(*), SUM(r.rating),
+       COALESCE(SUM(r.cleanliness_rating), 0), COUNT(r.cleanliness_rating),
+       COALESCE(SUM(r.communication_rating), 0), COUNT(r.communication_rating),
+       COALESCE(SUM(r.check_in_rating), 0), COUNT(r.check_in_rating),
+       COALESCE(SUM(r.accuracy_rating), 0), COUNT(r.accuracy_rating),
+       COALESCE(SUM(r.location_rating), 0), COUNT(r.location_rating),
+       COALESCE(SUM(r.value_rating), 0), COUNT(r.value_rating)
+FROM reviews r
+JOIN bookings b ON b.booking_id = r.booking_id
+WHERE r.review_type = 'guest_to_host'
+GROUP BY b.property_id;
+
+-- property_summary now reads the maintained totals instead of joining reviews
+CREATE OR REPLACE VIEW property_summary AS
+SELECT 
+    p.property_id,
+    p.title,
+    p.property_type,
+    p.max_guests,
+    p.bedrooms,
+    p.bathrooms,
+    p.price_per_night,
+    pa.city,
+    pa.country,
+    COALESCE(s.rating_sum / NULLIF(s.review_count, 0), 0) as average_rating,
+    COALESCE(s.review_count, 0) as review_count,
+    u.first_name as host_first_name,
+    u.last_name as host_last_name
+FROM properties p
+JOIN property_addresses pa ON p.property_id = pa.property_id
+JOIN users u ON p.host_id = u.user_id
+LEFT JOIN property_rating_summary s ON p.property_id = s.property_id
+WHERE p.is_active = TRUE;
+
+-- Per-host dashboard counters, kept current by property, booking, earning
+-- and review writes and reconciled periodically (python -m app.host_stats)
+CREATE TABLE host_stats (
+    host_id INT PRIMARY KEY,
+    total_properties INT NOT NULL DEFAULT 0,
+    completed_bookings INT NOT NULL DEFAULT 0,
+    net_earnings DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    reconciled_at TIMESTAMP NULL,
+    FOREIGN KEY (host_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+INSERT INTO host_stats (host_id, total_properties, completed_bookings,
+                        net_earnings, rating_sum, rating_count, reconciled_at)
+SELECT u.user_id,
+       COALESCE(p.total_properties, 0),
+       COALESCE(b.completed_bookings, 0),
+       COALESCE(e.net_earnings, 0),
+       COALESCE(r.rating_sum, 0),
+       COALESCE(r.rating_count, 0),
+       NOW()
+FROM users u
+LEFT JOIN (
+    SELECT host_id, COUNT(*) AS total_properties
+    FROM properties WHERE is_active = TRUE GROUP BY host_id
+) p ON p.host_id = u.user_id
+LEFT JOIN (
+    SELECT pr.host_id, COUNT(*) AS completed_bookings
+    FROM bookings bk JOIN properties pr ON pr.property_id = bk.property_id
+    WHERE bk.booking_status = 'completed' GROUP BY pr.host_id
+) b ON b.host_id = u.user_id
+LEFT JOIN (
+    SELECT host_id, SUM(net_amount) AS net_earnings
+    FROM host_earnings GROUP BY host_id
+) e ON e.host_id = u.user_id
+LEFT JOIN (
+    SELECT reviewee_id, SUM(rating) AS rating_sum, COUNT(*) AS rating_count
+    FROM reviews WHERE review_type = 'guest_to_host' GROUP BY reviewee_id
+) r ON r.reviewee_id = u.user_id
+WHERE u.is_host = TRUE;
+
+-- host_dashboard now reads the counters instead of fanning out over joins
+CREATE OR REPLACE VIEW host_dashboard AS
+SELECT 
+    u.user_id as host_id,
+    u.first_name,
+    u.last_name,
+    COALESCE(s.total_properties, 0) as total_properties,
+    COALESCE(s.completed_bookings, 0) as total_bookings,
+    COALESCE(s.net_earnings, 0) as total_earnings,
+    COALESCE(s.rating_sum / NULLIF(s.rating_count, 0), 0) as average_rating
+FROM users u
+LEFT JOIN host_stats s ON s.host_id = u.user_id
+WHERE u.is_host = TRUE;
+
+-- Per-property photo lookups (GET /property_photos/?property_id=, listing expansion)
+CREATE INDEX idx_property_photos_property_order ON property_photos(property_id, display_order);
+
+-- Resume points for chunked background jobs (booking lifecycle scheduler)
+CREATE TABLE scheduler_checkpoints (
+    job_name VARCHAR(100) PRIMARY KEY,
+    run_date DATE NOT NULL,
+    last_id INT NOT NULL DEFAULT 0,
+    processed INT NOT NULL DEFAULT 0,
+    completed BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Stored responses for Idempotency-Key replays (POST /bookings/); expired
+-- rows are purged by a background task
+CREATE TABLE idempotency_keys (
+    scope VARCHAR(64) NOT NULL,
+    idem_key VARCHAR(255) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    status_code SMALLINT NOT NULL,
+    response_body JSON NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (scope, idem_key),
+    INDEX idx_expires_at (expires_at)
+);